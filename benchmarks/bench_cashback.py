@@ -0,0 +1,71 @@
+"""
+Сравнение построчной и векторизованной реализации get_profitable_cashback_categories.
+
+Запуск:
+    python -m benchmarks.bench_cashback --rows 1000000
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.services import get_profitable_cashback_categories
+
+CATEGORIES = ["Супермаркеты", "Фастфуд", "Транспорт", "Переводы", "Аптеки", "ЖКХ", "Каршеринг", "Связь"]
+
+
+def make_operations(rows: int, seed: int = 0) -> list:
+    """Синтетические операции в формате reading_xlsx"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2021-01-01T00:00:00")
+    seconds = rng.integers(0, 3 * 365 * 24 * 3600, rows)
+    dates = (start + seconds.astype("timedelta64[s]")).astype(datetime)
+    categories = rng.integers(0, len(CATEGORIES), rows)
+    amounts = np.round(rng.normal(-1500, 2000, rows), 2)
+    return [
+        {"Дата операции": date.strftime("%d.%m.%Y %H:%M:%S"), "Категория": CATEGORIES[code], "Сумма операции": amount}
+        for date, code, amount in zip(dates, categories.tolist(), amounts.tolist())
+    ]
+
+
+def legacy_cashback(data: list, year: str, month: str) -> dict:
+    """Построчный алгоритм прежней версии (без логирования и с суммированием всех операций категории)"""
+    result: dict = {}
+    for x in data:
+        date_obj = datetime.strptime(x["Дата операции"], "%d.%m.%Y %H:%M:%S")
+        if date_obj.strftime("%Y") == year and date_obj.strftime("%m") == month:
+            amount = x["Сумма операции"]
+            if amount < 0 and x["Категория"] != "Переводы":
+                result[x["Категория"]] = result.get(x["Категория"], 0.0) + abs(amount * 0.01)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--year", default="2022")
+    parser.add_argument("--month", default="03")
+    args = parser.parse_args()
+
+    logging.getLogger("services").disabled = True
+    data = make_operations(args.rows)
+
+    started = time.perf_counter()
+    legacy_cashback(data, args.year, args.month)
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    get_profitable_cashback_categories.__wrapped__(data, args.year, args.month)
+    vectorized_time = time.perf_counter() - started
+
+    print(f"Строк: {args.rows}")
+    print(f"Построчно:         {legacy_time:.3f} с")
+    print(f"Векторизованно:    {vectorized_time:.3f} с")
+    print(f"Ускорение:         {legacy_time / vectorized_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
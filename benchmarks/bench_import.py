@@ -0,0 +1,61 @@
+"""
+Время запуска легких точек входа пакета src.
+
+Каждый замер выполняется в отдельном процессе, чтобы модули не были уже загружены.
+Запуск:
+    python -m benchmarks.bench_import --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "requests", "dotenv")
+ENTRY_POINT = """
+from src.views import generate_main_page
+from src.utils import hello_person, get_mask_account
+hello_person("30.01.2024 08:00:00")
+get_mask_account(1234567890123456)
+"""
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(statement: str = ENTRY_POINT, runs: int = 5) -> tuple[float, list[str]]:
+    """Медианное время выполнения statement в новом процессе и загруженные тяжелые модули"""
+    timings, heavy = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output)
+        timings.append(result["elapsed"])
+        heavy = result["heavy"]
+    return statistics.median(timings), heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    elapsed, heavy = measure(runs=args.runs)
+    print(f"Импорт src.views и вызов легких функций: {elapsed * 1000:.1f} мс (медиана из {args.runs})")
+    print(f"Загруженные тяжелые модули: {', '.join(heavy) or 'нет'}")
+
+
+if __name__ == "__main__":
+    main()
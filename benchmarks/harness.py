@@ -0,0 +1,75 @@
+"""Измерение пропускной способности, перцентилей задержки и пикового потребления памяти."""
+
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import numpy as np
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+REGRESSION_TOLERANCE = 0.2
+
+
+def measure(func: Callable[[], Any], rows: int, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Вызывает func repeat раз и возвращает задержки (p50/p95/p99, секунды), пропускную способность
+    (строк в секунду по медиане) и пиковый прирост памяти отдельного прогона под tracemalloc (байты).
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "throughput": rows / p50 if p50 > 0 else float("inf"),
+        "peak_memory": peak,
+    }
+
+
+def load_baselines(filename: str = BASELINE_FILE) -> dict:
+    """Сохраненные базовые результаты: {"<бенчмарк>@<строк>": результат}"""
+    try:
+        with open(filename, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(results: dict, filename: str = BASELINE_FILE) -> None:
+    """Дописывает результаты в файл базовых значений"""
+    baselines = load_baselines(filename)
+    baselines.update(results)
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(baselines, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def find_regressions(results: dict, baselines: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[str]:
+    """Бенчмарки, медиана или пиковая память которых выросли больше чем на tolerance относительно базы"""
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for metric in ("p50", "peak_memory"):
+            if baseline[metric] > 0 and result[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {baseline[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
@@ -0,0 +1,93 @@
+"""
+Бенчмарки функций анализа на синтетических выгрузках.
+
+Запуск:
+    python -m benchmarks.suite --sizes 10k 1m
+    python -m benchmarks.suite --sizes 10k --save-baseline
+Код возврата 1, если какой-либо бенчмарк стал медленнее базового значения больше чем на --tolerance.
+"""
+
+import argparse
+import inspect
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Callable
+
+from benchmarks.harness import (
+    BASELINE_FILE,
+    REGRESSION_TOLERANCE,
+    find_regressions,
+    load_baselines,
+    measure,
+    save_baselines,
+)
+from benchmarks.synthetic import SIZES, generate_operations, write_operations
+from src.reports import spending_by_category
+from src.services import get_profitable_cashback_categories
+from src.utils import analyze_transactions, reading_xlsx
+
+# EXCEL-файл на миллионы строк строится минутами и упирается в лимит листа, поэтому reading_xlsx
+# измеряется только на небольших выгрузках
+XLSX_MAX_ROWS = 100_000
+
+
+def cases(rows: int, workdir: str) -> dict[str, Callable[[], Any]]:
+    """Измеряемые вызовы для выгрузки из rows операций (без кэша результатов и фоновой записи отчетов)"""
+    operations = generate_operations(rows)
+    records = operations.to_dict(orient="records")
+    cashback = inspect.unwrap(get_profitable_cashback_categories)
+    spending = inspect.unwrap(spending_by_category)
+    last_date = operations["Дата операции"].iloc[0]
+    report_date = f"{last_date[6:10]}.{last_date[3:5]}.{last_date[0:2]}"
+
+    benchmarks = {
+        "get_profitable_cashback_categories": lambda: cashback(records, last_date[6:10], last_date[3:5]),
+        "spending_by_category": lambda: spending(operations, "Супермаркеты", report_date),
+        "analyze_transactions": lambda: analyze_transactions(operations),
+    }
+    if rows <= XLSX_MAX_ROWS:
+        filename = os.path.join(workdir, f"operations_{rows}.xlsx")
+        write_operations(operations, filename)
+        benchmarks["reading_xlsx"] = lambda: reading_xlsx(filename, use_cache=False)
+        benchmarks["reading_xlsx_cached"] = lambda: reading_xlsx(filename)
+    return benchmarks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["10k"], help="Размеры: " + ", ".join(SIZES) + " или число")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            rows = SIZES.get(size) or int(size)
+            for name, func in cases(rows, workdir).items():
+                result = measure(func, rows, repeat=args.repeat)
+                results[f"{name}@{rows}"] = result
+                print(
+                    f"{name:<36} {rows:>10} строк  p50 {result['p50'] * 1000:9.1f} мс  "
+                    f"p95 {result['p95'] * 1000:9.1f} мс  p99 {result['p99'] * 1000:9.1f} мс  "
+                    f"{result['throughput']:12.0f} строк/с  пик {result['peak_memory'] / 2**20:8.1f} МБ"
+                )
+
+    if args.save_baseline:
+        save_baselines(results, args.baseline)
+        print(f"Базовые значения сохранены в {args.baseline}")
+        return
+
+    regressions = find_regressions(results, load_baselines(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"РЕГРЕССИЯ {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
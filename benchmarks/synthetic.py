@@ -0,0 +1,140 @@
+"""
+Детерминированный генератор синтетических выгрузок операций с теми же столбцами, что и data/operations.xlsx.
+
+Запуск:
+    python -m benchmarks.synthetic --rows 1000000 --output operations_1m.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Категория, MCC (None — без MCC), описание, типичная сумма операции и доля в выгрузке
+CATEGORIES = [
+    ("Супермаркеты", 5411, "Колхоз", -400, 0.34),
+    ("Фастфуд", 5814, "Mouse Tail", -250, 0.19),
+    ("Транспорт", 4131, "Bars 2", -60, 0.06),
+    ("Переводы", None, "Константин Л.", -3000, 0.05),
+    ("Ж/д билеты", 4112, "РЖД", -1500, 0.04),
+    ("Различные товары", 5399, "Ozon.ru", -900, 0.03),
+    ("Связь", 7379, "Devajs Servis.", -400, 0.03),
+    ("Пополнения", None, "Пополнение через Газпромбанк", 5000, 0.03),
+    ("Аптеки", 5912, "Apteka 23", -500, 0.02),
+    ("Каршеринг", 7512, "Ситидрайв", -700, 0.02),
+    ("Рестораны", 5812, "Pivnaya", -1200, 0.02),
+    ("Бонусы", None, "Выплата по вашему обращению", 500, 0.02),
+    ("Наличные", 6011, "Снятие в банкомате Тинькофф", -5000, 0.015),
+    ("Дом и ремонт", 5200, "МаксидоМ", -2000, 0.015),
+    ("Услуги банка", None, "Плата за Программу страховой защиты", -300, 0.015),
+    ("Такси", 4121, "Яндекс Такси", -450, 0.01),
+    ("ЖКХ", None, "ЖКУ Квартира", -4000, 0.01),
+    ("Одежда и обувь", 5651, "WILDBERRIES", -2500, 0.01),
+    ("Электроника и техника", 5722, "DNS", -6000, 0.01),
+    ("Топливо", 5541, "ЛУКОЙЛ", -2000, 0.01),
+]
+CARDS = ["*7197", "*4556", "*5091", "*5441", "*1112"]
+CARD_WEIGHTS = [0.72, 0.17, 0.06, 0.03, 0.02]
+CURRENCIES = ["RUB", "TRY", "EUR", "CNY", "USD"]
+CURRENCY_WEIGHTS = [0.98, 0.011, 0.0045, 0.0027, 0.0018]
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def _format_dates(seconds: np.ndarray, with_time: bool) -> np.ndarray:
+    """Быстро форматирует секунды от эпохи как "ДД.ММ.ГГГГ чч:мм:сс" (или "ДД.ММ.ГГГГ")"""
+    moments = seconds.astype("datetime64[s]")
+    days = moments.astype("datetime64[D]")
+    months = moments.astype("datetime64[M]")
+    years = moments.astype("datetime64[Y]")
+    parts = [
+        ((days - months).astype(int) + 1, 2),
+        ((months - years).astype(int) + 1, 2),
+        (years.astype(int) + 1970, 4),
+    ]
+    separators = [".", ".", " ", ":", ":"]
+    if with_time:
+        second_of_day = (moments - days).astype(int)
+        parts += [(second_of_day // 3600, 2), (second_of_day // 60 % 60, 2), (second_of_day % 60, 2)]
+    else:
+        separators = separators[:2]
+
+    columns = []
+    for number, (values, width) in enumerate(parts):
+        for power in range(width - 1, -1, -1):
+            columns.append((values // 10**power % 10 + ord("0")).astype(np.uint8))
+        if number < len(separators):
+            columns.append(np.full(len(seconds), ord(separators[number]), dtype=np.uint8))
+    chars = np.ascontiguousarray(np.stack(columns, axis=1))
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(f"U{chars.shape[1]}").astype(object)
+
+
+def generate_operations(rows: int, seed: int = 0, start: str = "2018-01-01", years: int = 4) -> pd.DataFrame:
+    """
+    Синтетическая выгрузка из rows операций в схеме data/operations.xlsx.
+    При одинаковых rows и seed результат всегда одинаков.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([category[4] for category in CATEGORIES])
+    codes = rng.choice(len(CATEGORIES), size=rows, p=weights / weights.sum())
+
+    typical = np.array([category[3] for category in CATEGORIES], dtype=float)[codes]
+    amounts = np.round(typical * rng.lognormal(0, 0.8, rows), 2)
+    status = np.where(rng.random(rows) < 0.006, "FAILED", "OK")
+    currency = np.array(CURRENCIES, dtype=object)[rng.choice(len(CURRENCIES), size=rows, p=CURRENCY_WEIGHTS)]
+    cards = np.array(CARDS, dtype=object)[rng.choice(len(CARDS), size=rows, p=CARD_WEIGHTS)]
+    cards[rng.random(rows) < 0.1] = None
+
+    first = np.datetime64(start, "s").astype(np.int64)
+    seconds = np.sort(rng.integers(first, first + years * 365 * 24 * 3600, rows))[::-1]
+    payment_seconds = seconds + rng.integers(0, 3, rows) * 24 * 3600
+    payment_dates = _format_dates(payment_seconds, with_time=False)
+    payment_dates[rng.random(rows) < 0.0015] = None
+
+    mcc = np.array([np.nan if category[1] is None else category[1] for category in CATEGORIES])[codes]
+    cashback = np.where((amounts < 0) & (rng.random(rows) < 0.1), np.floor(-amounts * 0.01), np.nan)
+    bonuses = np.where(amounts < 0, np.floor(-amounts * 0.02), 0).astype(np.int64)
+    rounding = np.where((amounts < 0) & (rng.random(rows) < 0.01), rng.integers(1, 100, rows), 0)
+
+    return pd.DataFrame(
+        {
+            "Дата операции": _format_dates(seconds, with_time=True),
+            "Дата платежа": payment_dates,
+            "Номер карты": cards,
+            "Статус": status,
+            "Сумма операции": amounts,
+            "Валюта операции": currency,
+            "Сумма платежа": amounts,
+            "Валюта платежа": currency,
+            "Кэшбэк": cashback,
+            "Категория": np.array([category[0] for category in CATEGORIES], dtype=object)[codes],
+            "MCC": mcc,
+            "Описание": np.array([category[2] for category in CATEGORIES], dtype=object)[codes],
+            "Бонусы (включая кэшбэк)": bonuses,
+            "Округление на инвесткопилку": rounding,
+            "Сумма операции с округлением": np.abs(amounts) + rounding,
+        }
+    )
+
+
+def write_operations(operations: pd.DataFrame, filename: str) -> None:
+    """Сохраняет выгрузку в csv или xlsx (EXCEL ограничен 1 048 576 строками)"""
+    if filename.lower().endswith(".csv"):
+        operations.to_csv(filename, index=False)
+    else:
+        operations.to_excel(filename, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10k", help="Число строк или одно из: " + ", ".join(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows) or int(args.rows)
+    write_operations(generate_operations(rows, args.seed), args.output)
+    print(f"Записано {rows} операций в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import heapq
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.log import get_logger
+
+logger = get_logger("analytics")
+
+AMOUNT_COLUMN = "Сумма платежа"
+CARD_COLUMN = "Номер карты"
+INVALID_CARD = "Ошибка: Неверный номер карты"
+
+
+def _json_value(value: Any) -> Any:
+    """Значение строки операции в виде, пригодном для JSON: даты — ISO-строки, пропуски — None"""
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class TransactionAnalyzer:
+    """
+    Накопительный анализ транзакций по карте.
+    Новые операции добавляются через update() за время, пропорциональное их числу:
+    общая сумма, кэшбэк и ограниченная куча top_n крупнейших платежей обновляются без пересчета истории.
+    Состояние сериализуется в словарь и объединяется с состояниями других частей данных через merge().
+    """
+
+    def __init__(self, top_n: int = 5) -> None:
+        self.top_n = top_n
+        self.total_spent = 0.0
+        self.count = 0
+        self._heap: list[tuple[float, int, dict]] = []
+
+    def _push(self, amount: float, sequence: int, row: dict) -> None:
+        """Добавляет платеж в кучу, вытесняя наименьший (при равенстве — более поздний)"""
+        item = (amount, -sequence, row)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def update(self, transactions: pd.DataFrame) -> "TransactionAnalyzer":
+        """Учитывает новые транзакции"""
+        if transactions.empty:
+            return self
+        amounts = transactions[AMOUNT_COLUMN]
+        self.total_spent += amounts.sum()
+        positions = amounts.reset_index(drop=True).nlargest(self.top_n).index
+        candidates = transactions.iloc[positions].to_dict(orient="records")
+        for position, row in zip(positions.tolist(), candidates):
+            self._push(row[AMOUNT_COLUMN], self.count + position, row)
+        self.count += len(transactions)
+        logger.info(f"Добавлено {len(transactions)} транзакций, всего {self.count}")
+        return self
+
+    def merge(self, other: "TransactionAnalyzer") -> "TransactionAnalyzer":
+        """Объединяет состояние с анализатором следующей по порядку части данных"""
+        merged = TransactionAnalyzer(max(self.top_n, other.top_n))
+        merged.total_spent = self.total_spent + other.total_spent
+        merged.count = self.count + other.count
+        for amount, sequence, row in self._heap:
+            merged._push(amount, -sequence, row)
+        for amount, sequence, row in other._heap:
+            merged._push(amount, self.count - sequence, row)
+        return merged
+
+    def top_transactions(self) -> pd.DataFrame:
+        """Крупнейшие платежи по убыванию суммы"""
+        ordered = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+        return pd.DataFrame([row for _, _, row in ordered])
+
+    def result(self) -> dict:
+        """Результат в формате analyze_transactions"""
+        if self.count == 0:
+            return {"total_spent": 0, "cashback": 0, "top_5_transactions": pd.DataFrame()}
+        return {
+            "total_spent": self.total_spent,
+            "cashback": self.total_spent // 100,
+            "top_5_transactions": self.top_transactions(),
+        }
+
+    def to_dict(self) -> dict:
+        """Состояние анализатора в виде словаря, пригодного для JSON (даты строк — ISO-строки, пропуски — None)"""
+        return {
+            "top_n": self.top_n,
+            "total_spent": float(self.total_spent),
+            "count": self.count,
+            "top": [
+                {"sequence": -sequence, "row": {key: _json_value(value) for key, value in row.items()}}
+                for _, sequence, row in self._heap
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict[str, Any]) -> "TransactionAnalyzer":
+        """Восстанавливает анализатор из словаря, полученного через to_dict()"""
+        analyzer = cls(state["top_n"])
+        analyzer.total_spent = state["total_spent"]
+        analyzer.count = state["count"]
+        for item in state["top"]:
+            analyzer._push(item["row"][AMOUNT_COLUMN], item["sequence"], item["row"])
+        return analyzer
+
+
+def mask_card_numbers(cards: pd.Series) -> pd.Series:
+    """Векторный вариант get_mask_account: маскирует весь столбец номеров карт по правилу XXXX ** XXXX.
+    Номера, уже замаскированные в выгрузке (например, "*7197"), возвращаются без изменений"""
+    if pd.api.types.is_numeric_dtype(cards):
+        cards = cards.astype("Int64")
+    numbers = cards.astype("string")
+    masked = numbers.str[:4] + " ** " + numbers.str[-4:]
+    already_masked = numbers.str.contains("*", regex=False).fillna(False).astype(bool)
+    masked = masked.where(~already_masked, numbers)
+    valid = ((numbers.str.len() >= 6) | already_masked).fillna(False).astype(bool)
+    return masked.where(valid, INVALID_CARD).astype(object)
+
+
+def analyze_by_card(transactions: pd.DataFrame, top_n: int = 5) -> dict[str, dict]:
+    """
+    Анализ транзакций отдельно по каждой карте за один проход:
+    операции группируются по номеру карты один раз, суммы считаются через np.bincount,
+    а топ платежей берется из одной сортировки по (карта, сумма).
+    Операции без суммы платежа пропускаются, как и в analyze_transactions.
+    """
+    cards = transactions[CARD_COLUMN]
+    codes, numbers = pd.factorize(cards)
+    amounts = transactions[AMOUNT_COLUMN].to_numpy(dtype=float)
+    known = (codes >= 0) & ~np.isnan(amounts)
+    codes = codes[known]
+    amounts = amounts[known]
+    frame = transactions.loc[known]
+
+    totals = np.bincount(codes, weights=amounts, minlength=len(numbers))
+    order = np.lexsort((-amounts, codes))
+    sorted_codes = codes[order]
+    starts = np.searchsorted(sorted_codes, np.arange(len(numbers)))
+    keep = np.arange(len(order)) - starts[sorted_codes] < top_n
+    top = frame.iloc[order[keep]]
+    top_starts = np.searchsorted(sorted_codes[keep], np.arange(len(numbers) + 1))
+    masked = mask_card_numbers(pd.Series(numbers))
+
+    result = {}
+    for code, number in enumerate(numbers):
+        result[str(number)] = {
+            "masked_account": masked.iloc[code],
+            "total_spent": totals[code],
+            "cashback": totals[code] // 100,
+            "top_5_transactions": top.iloc[top_starts[code] : top_starts[code + 1]].reset_index(drop=True),
+        }
+    logger.info(f"Проанализировано {len(frame)} транзакций по {len(numbers)} картам")
+    return result
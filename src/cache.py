@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable
+
+from src import metrics
+from src.log import get_logger
+
+logger = get_logger("cache")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Данные, загруженные из файла: id объекта -> (слабая ссылка на него, версия файла)
+_sources: dict[int, tuple[weakref.ref, str]] = {}
+_sources_lock = threading.Lock()
+
+
+def tag_source(data: Any, filename: str) -> Any:
+    """
+    Помечает данные, только что загруженные из файла, версией этого файла (путь, время изменения и размер).
+    Помечается сам объект, а не его содержимое: производные DataFrame и списки метки не получают,
+    а помеченные данные считаются неизменными после загрузки. Возвращает переданные данные.
+    """
+    version = _source_version(filename)
+    if version is None:
+        return data
+    key = id(data)
+
+    def forget(ref: weakref.ref) -> None:
+        with _sources_lock:
+            if _sources.get(key, (None,))[0] is ref:
+                del _sources[key]
+
+    with _sources_lock:
+        _sources[key] = (weakref.ref(data, forget), repr(version))
+    return data
+
+
+def _shape(data: Any) -> Any:
+    """Число строк и столбцы данных — дешевая проверка, что помеченные данные не дополнялись после загрузки"""
+    columns = getattr(data, "columns", None)
+    return [len(data), None if columns is None else [str(column) for column in columns]]
+
+
+def dataset_fingerprint(data: Any) -> str | None:
+    """
+    Отпечаток набора операций без просмотра данных при каждом вызове:
+    атрибут fingerprint заранее построенного объекта (Transactions, RollupStore, SpendingIndex)
+    или версия файла, из которого загружены данные (см. tag_source).
+    Для прочих DataFrame, списков и потоков возвращается None: их содержимое не хэшируется.
+    """
+    fingerprint = getattr(data, "fingerprint", None)
+    if isinstance(fingerprint, str):
+        return fingerprint
+    with _sources_lock:
+        entry = _sources.get(id(data))
+    if entry is not None and entry[0]() is data:
+        return f"{entry[1]}-{_shape(data)}"
+    return None
+
+
+def _source_version(source: str | None) -> Any:
+    """Версия файла операций (время изменения и размер), если он задан"""
+    if source is None:
+        return None
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    return [os.path.abspath(source), stat.st_mtime_ns, stat.st_size]
+
+
+class ResultCache:
+    """
+    Двухуровневый кэш результатов: LRU в памяти с ограничением по суммарному размеру
+    и необязательный каталог на диске. Значения хранятся сериализованными, поэтому
+    каждый вызов получает свою копию результата.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_dir: str | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """Сериализованное значение по ключу из памяти или с диска"""
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return payload
+        if self.disk_dir is not None:
+            try:
+                with open(os.path.join(self.disk_dir, f"{key}.pkl"), "rb") as file:
+                    payload = file.read()
+            except OSError:
+                payload = None
+            if payload is not None:
+                self._remember(key, payload)
+                with self._lock:
+                    self.hits += 1
+                return payload
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, payload: bytes) -> None:
+        """Сохраняет значение в памяти и, если задан каталог, на диске"""
+        self._remember(key, payload)
+        if self.disk_dir is not None:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                descriptor, tmp_name = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+                with os.fdopen(descriptor, "wb") as file:
+                    file.write(payload)
+                os.replace(tmp_name, os.path.join(self.disk_dir, f"{key}.pkl"))
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить результат на диск: {e}")
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        """Добавляет значение в LRU, вытесняя самые старые при превышении размера"""
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.size -= len(self._items.pop(key))
+            self._items[key] = payload
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        """Очищает уровень в памяти"""
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+def cached_report(
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    disk_dir: str | None = None,
+    source: str | None = None,
+    skip: Callable[..., bool] | None = None,
+) -> Callable:
+    """
+    Кэширует результат функции, формирующей отчет.
+    Ключ — отпечаток набора операций (первый аргумент), остальные аргументы и версия файла source
+    (время изменения и размер), поэтому при изменении данных или файла операций результат пересчитывается.
+    Если задан source, данные без отпечатка считаются загруженными из этого файла и тоже кэшируются,
+    иначе такие вызовы выполняются без кэша. Вызовы, для которых skip(*args, **kwargs) истинно
+    (например, результат зависит от текущего времени), не кэшируются.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = ResultCache(max_bytes, disk_dir)
+
+        @functools.wraps(func)
+        def wrapper(data: Any, *args: Any, **kwargs: Any) -> Any:
+            if skip is not None and skip(data, *args, **kwargs):
+                return func(data, *args, **kwargs)
+            fingerprint = dataset_fingerprint(data)
+            version = _source_version(source)
+            if fingerprint is None and version is None:
+                return func(data, *args, **kwargs)
+            key_data = [func.__module__, func.__qualname__, fingerprint, repr(args), repr(sorted(kwargs.items()))]
+            key_data.append(version)
+            key = hashlib.blake2b(repr(key_data).encode("utf-8"), digest_size=16).hexdigest()
+
+            payload = cache.get(key)
+            if payload is not None:
+                metrics.increment("cache.hit")
+                return pickle.loads(payload)
+            metrics.increment("cache.miss")
+            result = func(data, *args, **kwargs)
+            cache.put(key, pickle.dumps(result))
+            return result
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Iterable
+
+import numpy as np
+import requests
+
+from src import metrics
+from src.log import get_logger
+
+logger = get_logger("currency")
+
+API_URL = "https://api.apilayer.com/exchangerates_data"
+
+
+class ExchangeRateService:
+    """
+    Сервис курсов валют к рублю.
+    Держит пул соединений (requests.Session), запрашивает курс каждой валюты не чаще одного раза
+    за ttl секунд и пересчитывает любое количество сумм локально.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        ttl: float = 3600,
+        timeout: float = 10,
+        target: str = "RUB",
+        session: requests.Session | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = (base_url or os.getenv("EXCHANGE_API_URL") or API_URL).rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.target = target
+        self.session = session or requests.Session()
+        self._rates: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _fetch_rate(self, currency_code: str) -> float:
+        """Запрашивает у API курс одной единицы валюты"""
+        response = self.session.get(
+            f"{self.base_url}/convert",
+            params={"to": self.target, "from": currency_code, "amount": 1},
+            headers={"apikey": self.api_key or ""},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return float(response.json()["result"])
+
+    def get_rate(self, currency_code: str) -> float:
+        """Курс валюты из кэша или, если он устарел, из API"""
+        if currency_code == self.target:
+            return 1.0
+        with self._lock:
+            cached = self._rates.get(currency_code)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            metrics.increment("currency.rate_cache_hit")
+            return cached[0]
+
+        metrics.increment("currency.rate_cache_miss")
+        with metrics.span("currency.fetch"):
+            rate = self._fetch_rate(currency_code)
+        logger.info(f"Получен курс {currency_code}/{self.target}: {rate}")
+        with self._lock:
+            self._rates[currency_code] = (rate, time.monotonic())
+        return rate
+
+    def get_rates(self, currency_codes: Iterable[str]) -> dict[str, float]:
+        """Курсы нескольких валют (каждая запрашивается не больше одного раза)"""
+        return {code: self.get_rate(code) for code in dict.fromkeys(currency_codes)}
+
+    async def get_rates_async(self, currency_codes: Iterable[str]) -> dict[str, float]:
+        """Асинхронно запрашивает курсы нескольких валют одновременно"""
+        codes = list(dict.fromkeys(currency_codes))
+        rates = await asyncio.gather(*(asyncio.to_thread(self.get_rate, code) for code in codes))
+        return dict(zip(codes, rates))
+
+    def convert(self, currency_code: str, amounts: Any) -> Any:
+        """Переводит сумму или массив сумм в целевую валюту по одному курсу"""
+        converted = np.round(np.asarray(amounts, dtype=float) * self.get_rate(currency_code), 2)
+        return float(converted) if converted.ndim == 0 else converted
+
+    def clear(self) -> None:
+        """Сбрасывает кэш курсов"""
+        with self._lock:
+            self._rates.clear()
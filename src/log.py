@@ -0,0 +1,112 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s: %(message)s"
+
+_queue: queue.Queue = queue.Queue(-1)
+_listener: QueueListener | None = None
+_file_handlers: dict[str, logging.Handler] = {}
+_sample_counts: dict[str, int] = {}
+_lock = threading.Lock()
+_log_dir: str | None = None
+
+
+def log_dir() -> str:
+    """Каталог логов: заданный через configure_logging, переменную окружения LOG_DIR или logs/ проекта"""
+    return _log_dir or os.getenv("LOG_DIR") or os.path.join(PROJECT_DIR, "logs")
+
+
+def _file_handler(name: str) -> logging.Handler:
+    """Файловый обработчик для логгера name; файл открывается при первой записи"""
+    directory = log_dir()
+    os.makedirs(directory, exist_ok=True)
+    handler = logging.FileHandler(os.path.join(directory, f"{name}.log"), "w", encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(logging.Filter(name))
+    return handler
+
+
+def _start_listener() -> None:
+    """Запускает общий поток записи логов"""
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(_queue, *_file_handlers.values(), respect_handler_level=True)
+        _listener.start()
+    else:
+        _listener.handlers = tuple(_file_handlers.values())
+
+
+def _ensure_file_handler(name: str) -> None:
+    """Создает файловый обработчик логгера и запускает поток записи, если этого еще не было"""
+    if name in _file_handlers and _listener is not None:
+        return
+    with _lock:
+        if name not in _file_handlers:
+            _file_handlers[name] = _file_handler(name)
+            _start_listener()
+        elif _listener is None:
+            _start_listener()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler, который настраивает запись в файл только при первой записи в лог"""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(_queue)
+        self.logger_name = name
+
+    def emit(self, record: logging.LogRecord) -> None:
+        _ensure_file_handler(self.logger_name)
+        super().emit(record)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Логгер модуля с записью в <каталог логов>/<name>.log.
+    Модуль только кладет записи в очередь (QueueHandler), а форматирование и запись в файл
+    выполняет общий фоновый QueueListener. Файл и поток записи создаются при первой записи.
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        if not any(isinstance(handler, _DeferredQueueHandler) for handler in logger.handlers):
+            logger.setLevel(logging.INFO)
+            logger.addHandler(_DeferredQueueHandler(name))
+    return logger
+
+
+def configure_logging(directory: str) -> None:
+    """Переносит файлы логов всех модулей в каталог directory"""
+    global _log_dir
+    with _lock:
+        _log_dir = directory
+        for name, handler in list(_file_handlers.items()):
+            handler.close()
+            _file_handlers[name] = _file_handler(name)
+        if _listener is not None:
+            _listener.handlers = tuple(_file_handlers.values())
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Дописывает записи из очереди и закрывает файлы логов"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in _file_handlers.values():
+            handler.close()
+
+
+def log_sampled(logger: logging.Logger, key: str, message: str, every: int = 1000) -> None:
+    """Для частых событий пишет только первую и каждую every-ю запись с числом повторений"""
+    with _lock:
+        count = _sample_counts.get(key, 0) + 1
+        _sample_counts[key] = count
+    if count == 1 or count % every == 0:
+        logger.info(f"{message} (повторений: {count})")
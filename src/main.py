@@ -0,0 +1,170 @@
+"""
+Пакетный запуск отчетов по одной выгрузке операций.
+
+Выгрузка разбирается один раз (через столбцовый кэш src.store), общие структуры — компактное
+представление операций, куб кешбэка и анализ по картам — строятся при первом задании, которому они нужны,
+одинаковые задания выполняются один раз. Результаты пишутся построчно в формате JSON Lines.
+
+Файл заданий — JSON Lines или JSON-массив, например:
+    {"report": "cashback", "year": "2021", "month": "11"}
+    {"report": "spending", "category": "Супермаркеты", "date": "2021.12.31"}
+    {"report": "card", "card": "*7197"}
+
+Запуск:
+    python -m src.main data/operations.xlsx jobs.jsonl --output results.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import sys
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, TextIO
+
+from src.log import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.services import CashbackCube
+    from src.transactions import Transactions
+
+logger = get_logger("main")
+
+REPORTS = ("cashback", "spending", "card")
+
+
+def load_jobs(file: TextIO) -> list[dict]:
+    """Читает задания из JSON-массива или JSON Lines (пустые строки пропускаются)"""
+    text = file.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _job_key(job: dict) -> str:
+    """Ключ задания без учета порядка полей — одинаковые задания выполняются один раз"""
+    return json.dumps(job, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class BatchRunner:
+    """
+    Выполняет задания отчетов над одной уже разобранной выгрузкой.
+    Общие структуры строятся лениво и переиспользуются всеми заданиями, результаты одинаковых заданий
+    берутся из памяти, а все задания кешбэка отвечаются одним кубом за один проход по данным.
+    """
+
+    def __init__(self, operations: pd.DataFrame) -> None:
+        self.operations = operations
+        self._results: dict[str, Any] = {}
+
+    @functools.cached_property
+    def transactions(self) -> Transactions:
+        from src.transactions import Transactions
+
+        return Transactions.from_frame(self.operations)
+
+    @functools.cached_property
+    def cube(self) -> CashbackCube:
+        from src.services import CashbackCube
+
+        return CashbackCube(self.transactions)
+
+    @functools.cached_property
+    def cards(self) -> dict[str, dict]:
+        from src.analytics import analyze_by_card
+
+        return analyze_by_card(self.operations)
+
+    def _cashback(self, job: dict) -> Any:
+        from src.services import get_cashback_by_periods
+
+        period = (f"{int(job['year']):04d}", f"{int(job['month']):02d}")
+        result = json.loads(get_cashback_by_periods(self.cube, [period]))
+        if not result:
+            raise ValueError(f"Неверный период {job['year']}-{job['month']}")
+        return result[f"{period[0]}-{period[1]}"]
+
+    def _spending(self, job: dict) -> Any:
+        from src.reports import calculate_spending_by_category
+
+        # Результат пишется в вывод пакета, а не в общий файл отчетов
+        result = calculate_spending_by_category(self.transactions, job["category"], job.get("date"))
+        if result == "":
+            raise ValueError(f"Не удалось рассчитать траты по категории {job['category']}")
+        return result
+
+    def _card(self, job: dict) -> Any:
+        card = str(job["card"])
+        if card not in self.cards:
+            raise ValueError(f"Нет операций по карте {card}")
+        return self.cards[card]
+
+    def run_job(self, job: dict) -> Any:
+        """Результат одного задания (повторное задание берется из памяти)"""
+        if not isinstance(job, dict):
+            raise TypeError(f"Задание должно быть объектом JSON, получено {type(job).__name__}")
+        key = _job_key(job)
+        if key not in self._results:
+            report = job.get("report")
+            if report not in REPORTS:
+                raise ValueError(f"Неизвестный отчет {report!r}, доступны: {', '.join(REPORTS)}")
+            self._results[key] = getattr(self, f"_{report}")(job)
+        return self._results[key]
+
+    def run(self, jobs: Iterable[dict]) -> Iterator[dict]:
+        """Выполняет задания по порядку; ошибка задания попадает в его запись и не прерывает пакет"""
+        for job in jobs:
+            try:
+                yield {"job": job, "result": self.run_job(job)}
+            except KeyError as e:
+                logger.error(f"В задании {job} нет поля {e}")
+                yield {"job": job, "error": f"В задании нет поля {e}"}
+            except (TypeError, ValueError) as e:
+                logger.error(f"Задание {job} завершилось ошибкой: {e}")
+                yield {"job": job, "error": str(e)}
+            except Exception as e:
+                logger.error(f"Задание {job} завершилось непредвиденной ошибкой: {e!r}")
+                yield {"job": job, "error": f"Непредвиденная ошибка: {e!r}"}
+
+
+def run_batch(operations_file: str, jobs: list[dict], output: TextIO) -> int:
+    """Загружает выгрузку один раз, выполняет задания и пишет результаты в output. Возвращает число ошибок"""
+    from src.reports import to_json_line
+    from src.store import load_operations
+
+    logger.info(f"Пакет из {len(jobs)} заданий по {operations_file}")
+    runner = BatchRunner(load_operations(operations_file))
+    errors = 0
+    for record in runner.run(jobs):
+        errors += "error" in record
+        output.write(to_json_line(record) + "\n")
+        output.flush()
+    logger.info(f"Пакет выполнен: {len(jobs)} заданий, {len(runner._results)} уникальных, ошибок {errors}")
+    return errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("operations", help="Выгрузка операций (xlsx или csv)")
+    parser.add_argument("jobs", help="Файл заданий (JSON Lines или JSON-массив), - для стандартного ввода")
+    parser.add_argument("--output", "-o", default="-", help="Файл результатов JSON Lines, - для стандартного вывода")
+    args = parser.parse_args(argv)
+
+    if args.jobs == "-":
+        jobs = load_jobs(sys.stdin)
+    else:
+        with open(args.jobs, encoding="utf-8") as file:
+            jobs = load_jobs(file)
+
+    if args.output == "-":
+        errors = run_batch(args.operations, jobs, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            errors = run_batch(args.operations, jobs, output)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+_enabled = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_spans: dict[str, dict[str, float]] = {}
+_counters: dict[str, float] = {}
+
+
+def enable() -> None:
+    """Включает сбор метрик (по умолчанию включается переменной окружения METRICS_ENABLED=1)"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Выключает сбор метрик"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Сбрасывает накопленные метрики"""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class _Span:
+    """Замер времени этапа; число обработанных строк можно указать заранее или через add_rows()"""
+
+    __slots__ = ("name", "rows", "started")
+
+    def __init__(self, name: str, rows: int) -> None:
+        self.name = name
+        self.rows = rows
+        self.started = 0.0
+
+    def add_rows(self, rows: int) -> None:
+        self.rows += rows
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        with _lock:
+            stats = _spans.setdefault(self.name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0})
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            stats["rows"] += self.rows
+
+
+class _DisabledSpan:
+    """Этап при выключенных метриках: поддерживает тот же интерфейс, что и _Span, но ничего не записывает"""
+
+    __slots__ = ()
+
+    def add_rows(self, rows: int) -> None:
+        pass
+
+    def __enter__(self) -> "_DisabledSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_disabled_span = _DisabledSpan()
+
+
+def span(name: str, rows: int = 0) -> _Span | _DisabledSpan:
+    """Контекст для замера этапа name; при выключенных метриках возвращает общий пустой этап"""
+    if not _enabled:
+        return _disabled_span
+    return _Span(name, rows)
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Увеличивает счетчик name (например, попадания и промахи кэша)"""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def timed(name: str) -> Callable:
+    """Декоратор: замеряет каждый вызов функции как этап name"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot() -> dict:
+    """Текущие метрики: этапы (вызовы, время, строки) и счетчики"""
+    with _lock:
+        return {"spans": {name: dict(stats) for name, stats in _spans.items()}, "counters": dict(_counters)}
+
+
+def export_json() -> str:
+    """Метрики в формате JSON"""
+    return json.dumps(snapshot(), ensure_ascii=False, sort_keys=True)
+
+
+def export_prometheus(prefix: str = "bank_app") -> str:
+    """Метрики в текстовом формате Prometheus"""
+    data = snapshot()
+    lines = []
+    for metric, field, description in (
+        ("stage_calls_total", "calls", "Число выполнений этапа"),
+        ("stage_seconds_total", "seconds", "Суммарное время этапа, секунды"),
+        ("stage_max_seconds", "max_seconds", "Максимальное время одного выполнения этапа, секунды"),
+        ("stage_rows_total", "rows", "Число обработанных строк"),
+    ):
+        lines.append(f"# HELP {prefix}_{metric} {description}")
+        lines.append(f"# TYPE {prefix}_{metric} {'gauge' if field == 'max_seconds' else 'counter'}")
+        for name, stats in sorted(data["spans"].items()):
+            lines.append(f'{prefix}_{metric}{{stage="{name}"}} {stats[field]}')
+    lines.append(f"# HELP {prefix}_events_total Счетчики событий")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def profile(func: Callable, *args: Any, top: int = 20, **kwargs: Any) -> tuple[Any, dict]:
+    """
+    Выполняет один вызов func под cProfile и tracemalloc.
+    Возвращает результат и отчет: время, пиковую память, крупнейшие места выделения памяти
+    и текстовую сводку профилировщика по суммарному времени.
+    """
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    finally:
+        tracemalloc.stop()
+
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(top)
+    report = {
+        "seconds": elapsed,
+        "peak_memory": peak,
+        "allocations": [str(statistic) for statistic in allocations],
+        "profile": output.getvalue(),
+    }
+    return result, report
@@ -0,0 +1,246 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.analytics import AMOUNT_COLUMN, CARD_COLUMN
+from src.log import get_logger
+from src.services import format_cashback
+from src.store import fill_missing_labels, operation_dates, operation_periods, period_bounds
+
+logger = get_logger("parallel")
+
+SHARD_KEYS = ("month", "card", None)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Подключается к блоку разделяемой памяти, не передавая его под контроль resource_tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedColumns:
+    """
+    Числовые столбцы операций в разделяемой памяти.
+    Рабочие процессы получают только имена блоков и открывают массивы без копирования и pickle.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]) -> None:
+        self.blocks: list[shared_memory.SharedMemory] = []
+        self.specs: dict[str, tuple[str, str, int]] = {}
+        for name, values in columns.items():
+            values = np.ascontiguousarray(values)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self.blocks.append(block)
+            self.specs[name] = (block.name, values.dtype.str, len(values))
+
+    def __enter__(self) -> "SharedColumns":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Освобождает блоки разделяемой памяти"""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _open_columns(specs: dict[str, tuple[str, str, int]], start: int, end: int) -> tuple[list, dict]:
+    """Открывает в рабочем процессе срез [start, end) каждого столбца"""
+    blocks, columns = [], {}
+    for name, (block_name, dtype, length) in specs.items():
+        block = _attach(block_name)
+        blocks.append(block)
+        columns[name] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)[start:end]
+    return blocks, columns
+
+
+def _close_columns(blocks: list) -> None:
+    for block in blocks:
+        block.close()
+
+
+def _cashback_partial(specs: dict, start: int, end: int, period: int, excluded: int, size: int) -> np.ndarray:
+    """Частичные суммы кешбэка по кодам категорий для одной части данных"""
+    blocks, columns = _open_columns(specs, start, end)
+    try:
+        codes, amounts = columns["category"], columns["amount"]
+        mask = (columns["period"] == period) & (amounts < 0) & (codes >= 0) & (codes != excluded)
+        return np.stack(
+            [
+                np.bincount(codes[mask], weights=-amounts[mask] * 0.01, minlength=size),
+                np.bincount(codes[mask], minlength=size).astype(float),
+            ]
+        )
+    finally:
+        _close_columns(blocks)
+
+
+def _spending_partial(
+    specs: dict, start: int, end: int, category: int, start_date: int, end_date: int, numeric: list[str]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Помесячные суммы числовых столбцов по категории для одной части данных"""
+    blocks, columns = _open_columns(specs, start, end)
+    try:
+        dates = columns["date"]
+        mask = (columns["category"] == category) & (dates >= start_date) & (dates <= end_date)
+        months, inverse = np.unique(columns["month"][mask], return_inverse=True)
+        sums = np.stack([np.bincount(inverse, weights=columns[name][mask], minlength=len(months)) for name in numeric])
+        return months, sums.reshape(len(numeric), len(months))
+    finally:
+        _close_columns(blocks)
+
+
+def _analyze_partial(specs: dict, start: int, end: int, top_n: int) -> tuple[float, int, np.ndarray]:
+    """Сумма платежей и позиции top_n крупнейших платежей одной части данных"""
+    blocks, columns = _open_columns(specs, start, end)
+    try:
+        amounts = columns["payment"]
+        positions = columns["position"]
+        order = np.lexsort((positions, -amounts))[:top_n]
+        return float(amounts.sum()), len(amounts), positions[order].copy()
+    finally:
+        _close_columns(blocks)
+
+
+class ParallelBackend:
+    """
+    Параллельный расчет отчетов в пуле процессов.
+    Операции упорядочиваются по ключу шардирования (месяц или карта) и делятся на части по границам
+    значений ключа, так что все операции месяца (карты) попадают в одну часть. Числовые столбцы
+    переносятся в разделяемую память, и каждый процесс считает частичный агрегат своей части,
+    после чего частичные результаты объединяются.
+    """
+
+    def __init__(self, transactions: pd.DataFrame, workers: int | None = None, shard_by: str | None = "month") -> None:
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"Неизвестный ключ шардирования {shard_by}")
+        if shard_by == "card" and CARD_COLUMN not in transactions:
+            raise ValueError(f"Для шардирования по картам нужен столбец {CARD_COLUMN}")
+        self.workers = workers or os.cpu_count() or 1
+        dates = operation_dates(transactions)
+        periods = operation_periods(dates)
+        if shard_by == "month":
+            keys = periods
+        elif shard_by == "card":
+            keys = pd.factorize(transactions[CARD_COLUMN])[0]
+        else:
+            keys = None
+        order = np.arange(len(transactions)) if keys is None else np.argsort(keys, kind="stable")
+        self.keys = None if keys is None else keys[order]
+
+        self.transactions = transactions
+        self.frame = transactions.iloc[order].reset_index(drop=True)
+        self.dates = dates.iloc[order].reset_index(drop=True)
+        codes, categories = pd.factorize(fill_missing_labels(self.frame["Категория"]))
+        self.categories = [str(category) for category in categories]
+        self.numeric = list(self.frame.select_dtypes("number").columns)
+
+        columns = {
+            "position": order.astype(np.int64),
+            "date": self.dates.to_numpy().astype("datetime64[ns]").astype(np.int64),
+            "period": periods[order].astype(np.int64),
+            "month": self.dates.to_numpy().astype("datetime64[M]").astype(np.int64),
+            "category": codes.astype(np.int32),
+        }
+        if "Сумма операции" in self.frame:
+            columns["amount"] = self.frame["Сумма операции"].to_numpy(dtype=float)
+        if AMOUNT_COLUMN in self.frame:
+            columns["payment"] = self.frame[AMOUNT_COLUMN].to_numpy(dtype=float)
+        for number, name in enumerate(self.numeric):
+            columns[f"numeric_{number}"] = np.nan_to_num(self.frame[name].to_numpy(dtype=float))
+        self.shared = SharedColumns(columns)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self) -> "ParallelBackend":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Останавливает пул процессов и освобождает разделяемую память"""
+        self.executor.shutdown()
+        self.shared.close()
+
+    def _shards(self) -> list[tuple[int, int]]:
+        """Границы частей данных для рабочих процессов: примерно равные части,
+        границы которых сдвинуты к ближайшей смене значения ключа шардирования"""
+        bounds = np.linspace(0, len(self.frame), self.workers + 1).astype(int)
+        if self.keys is not None:
+            changes = np.concatenate([[0], np.flatnonzero(self.keys[1:] != self.keys[:-1]) + 1, [len(self.keys)]])
+            bounds = np.unique(changes[np.searchsorted(changes, bounds)])
+        return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+    def _map(self, function: Any, *args: Any) -> list:
+        futures = [
+            self.executor.submit(function, self.shared.specs, start, end, *args) for start, end in self._shards()
+        ]
+        return [future.result() for future in futures]
+
+    def cashback(self, year: str, month: str) -> str:
+        """Параллельный аналог get_profitable_cashback_categories"""
+        excluded = self.categories.index("Переводы") if "Переводы" in self.categories else -1
+        size = len(self.categories)
+        total = sum(self._map(_cashback_partial, int(year) * 100 + int(month), excluded, size), np.zeros((2, size)))
+        present = total[1] > 0
+        result = pd.Series(total[0][present], index=np.array(self.categories, dtype=object)[present])
+        return format_cashback(result)
+
+    def spending_by_category(self, category: str, date: Any = None) -> list[dict]:
+        """Параллельный аналог spending_by_category (суммы числовых столбцов по месяцам)"""
+        start_date, end_date = period_bounds(date)
+        if category not in self.categories:
+            return []
+        specs = [f"numeric_{number}" for number in range(len(self.numeric))]
+        partials = self._map(
+            _spending_partial,
+            self.categories.index(category),
+            pd.Timestamp(start_date).value,
+            pd.Timestamp(end_date).value,
+            specs,
+        )
+        combined: dict[int, np.ndarray] = {}
+        for months, sums in partials:
+            for position, month in enumerate(months.tolist()):
+                combined[month] = combined.get(month, 0) + sums[:, position]
+        if not combined:
+            return []
+        months = pd.period_range(
+            pd.Period(np.datetime64(min(combined), "M"), "M"), pd.Period(np.datetime64(max(combined), "M"), "M")
+        )
+        rows = [combined.get(month.ordinal, np.zeros(len(self.numeric))) for month in months]
+        # Целочисленные столбцы остаются целыми, как в последовательном расчете
+        spending = pd.DataFrame(rows, columns=self.numeric, index=months)
+        return spending.astype(self.frame[self.numeric].dtypes.to_dict()).to_dict(orient="records")
+
+    def analyze_transactions(self, top_n: int = 5) -> dict:
+        """Параллельный аналог analyze_transactions"""
+        partials = self._map(_analyze_partial, top_n)
+        count = sum(partial[1] for partial in partials)
+        if count == 0:
+            return {"total_spent": 0, "cashback": 0, "top_5_transactions": pd.DataFrame()}
+        total_spent = sum(partial[0] for partial in partials)
+        positions = np.concatenate([partial[2] for partial in partials])
+        candidates = self.transactions.iloc[np.sort(positions)]
+        top_5_transactions = candidates.nlargest(top_n, AMOUNT_COLUMN)
+        return {"total_spent": total_spent, "cashback": total_spent // 100, "top_5_transactions": top_5_transactions}
+
+
+def parallel_report(transactions: pd.DataFrame, report: str, *args: Any, workers: int | None = None) -> Any:
+    """Разовый параллельный расчет отчета: "cashback", "spending_by_category" или "analyze_transactions" """
+    # Сумма и топ платежей не зависят от разбиения, поэтому для них данные просто делятся на равные части
+    shard_by = None if report == "analyze_transactions" else "month"
+    with ParallelBackend(transactions, workers=workers, shard_by=shard_by) as backend:
+        result = getattr(backend, report)(*args)
+    logger.info(f"Параллельно рассчитан отчет {report} на {backend.workers} процессах")
+    return result
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from typing import Iterable, Protocol
+
+import requests
+
+from src import metrics
+from src.log import get_logger
+
+logger = get_logger("quotes")
+
+DEFAULT_QUOTES = {"S&P 500": 4500.50, "Dow Jones": 34000.75, "NASDAQ": 15000.25}
+BATCH_SIZE = 50
+
+
+class QuoteBackend(Protocol):
+    """Источник котировок: одним вызовом возвращает цены нескольких инструментов"""
+
+    def fetch(self, symbols: list[str]) -> dict[str, float]: ...
+
+
+class StaticQuoteBackend:
+    """Котировки из заранее заданного словаря (по умолчанию — прежние фиксированные значения)"""
+
+    def __init__(self, quotes: dict[str, float] | None = None) -> None:
+        self.quotes = dict(DEFAULT_QUOTES if quotes is None else quotes)
+
+    def fetch(self, symbols: list[str]) -> dict[str, float]:
+        return {symbol: self.quotes[symbol] for symbol in symbols if symbol in self.quotes}
+
+
+class HttpQuoteBackend:
+    """
+    Котировки из HTTP API.
+    Инструменты запрашиваются пачками по batch_size в одном запросе
+    GET <base_url>/quotes?symbols=A,B,C, ответ: {"data": {"trends": [{"name": "A", "price": 1.0}, ...]}}.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = 10,
+        batch_size: int = BATCH_SIZE,
+        session: requests.Session | None = None,
+    ) -> None:
+        base_url = base_url or os.getenv("STOCK_API_URL")
+        if not base_url:
+            raise ValueError("Не задан адрес API котировок (STOCK_API_URL)")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.session = session or requests.Session()
+
+    def fetch(self, symbols: list[str]) -> dict[str, float]:
+        quotes = {}
+        for start in range(0, len(symbols), self.batch_size):
+            response = self.session.get(
+                f"{self.base_url}/quotes",
+                params={"symbols": ",".join(symbols[start : start + self.batch_size])},
+                headers={"apikey": self.api_key or ""},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            for trend in response.json()["data"]["trends"]:
+                quotes[trend["name"]] = float(trend["price"])
+        return quotes
+
+
+class QuoteProvider:
+    """
+    Кэш котировок поверх QuoteBackend.
+    Котировка свежая ttl секунд; устаревшая, но не старше stale_ttl, отдается сразу,
+    а обновление запускается в фоне (stale-while-revalidate). Отсутствующие котировки
+    запрашиваются в фоне одной пачкой, вызывающий код ждет их не дольше wait секунд.
+    """
+
+    def __init__(
+        self,
+        backend: QuoteBackend | None = None,
+        symbols: Iterable[str] = DEFAULT_QUOTES,
+        ttl: float = 60,
+        stale_ttl: float = 3600,
+    ) -> None:
+        self.backend = backend or StaticQuoteBackend()
+        self.symbols = list(symbols)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._quotes: dict[str, tuple[float, float]] = {}
+        self._pending: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    def _load(self, symbols: list[str], done: threading.Event) -> None:
+        """Запрашивает котировки пачкой и сохраняет их в кэш (выполняется в фоновом потоке)"""
+        try:
+            with metrics.span("quotes.fetch", rows=len(symbols)):
+                quotes = self.backend.fetch(symbols)
+            logger.info(f"Получены котировки: {len(quotes)} из {len(symbols)}")
+            now = time.monotonic()
+            with self._lock:
+                for symbol, price in quotes.items():
+                    self._quotes[symbol] = (price, now)
+        except Exception as e:
+            logger.error(f"Не удалось обновить котировки {symbols}: {e}")
+        finally:
+            with self._lock:
+                for symbol in symbols:
+                    if self._pending.get(symbol) is done:
+                        del self._pending[symbol]
+            done.set()
+
+    def refresh(self, symbols: Iterable[str] | None = None) -> list[threading.Event]:
+        """
+        Запускает фоновое обновление котировок; инструменты, которые уже обновляются, повторно не запрашиваются.
+        Возвращает события завершения всех обновлений, касающихся symbols.
+        """
+        symbols = list(dict.fromkeys(self.symbols if symbols is None else symbols))
+        done = threading.Event()
+        with self._lock:
+            waits = {id(self._pending[symbol]): self._pending[symbol] for symbol in symbols if symbol in self._pending}
+            missing = [symbol for symbol in symbols if symbol not in self._pending]
+            for symbol in missing:
+                self._pending[symbol] = done
+        if missing:
+            threading.Thread(target=self._load, args=(missing, done), name="quotes-refresh", daemon=True).start()
+            waits[id(done)] = done
+        return list(waits.values())
+
+    def get_quotes(self, symbols: Iterable[str] | None = None, wait: float | None = None) -> dict[str, float]:
+        """
+        Котировки инструментов symbols (по умолчанию — всех отслеживаемых) в заданном порядке.
+        Свежие и устаревшие котировки возвращаются сразу; если каких-то нет совсем, ждем их до wait секунд
+        (None — до завершения запроса). Не полученные к сроку инструменты в результат не попадают.
+        """
+        symbols = list(dict.fromkeys(self.symbols if symbols is None else symbols))
+        now = time.monotonic()
+        with self._lock:
+            cached = {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+        expired = [symbol for symbol in symbols if symbol not in cached or now - cached[symbol][1] >= self.ttl]
+        missing = [symbol for symbol in expired if symbol not in cached or now - cached[symbol][1] >= self.stale_ttl]
+        metrics.increment("quotes.cache_hit", len(symbols) - len(expired))
+        metrics.increment("quotes.stale", len(expired) - len(missing))
+        metrics.increment("quotes.cache_miss", len(missing))
+
+        if expired:
+            events = self.refresh(expired)
+            if missing:
+                deadline = None if wait is None else time.monotonic() + wait
+                for event in events:
+                    event.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+                with self._lock:
+                    cached.update({symbol: self._quotes[symbol] for symbol in missing if symbol in self._quotes})
+                now = time.monotonic()
+
+        return {
+            symbol: cached[symbol][0]
+            for symbol in symbols
+            if symbol in cached and now - cached[symbol][1] < self.stale_ttl
+        }
+
+    def start(self, interval: float | None = None) -> None:
+        """Запускает периодическое фоновое обновление всех отслеживаемых котировок (по умолчанию раз в ttl)"""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(
+            target=self._run, args=(interval or self.ttl,), name="quotes-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def stop(self) -> None:
+        """Останавливает периодическое обновление"""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            for event in self.refresh():
+                event.wait()
+            self._stop.wait(interval)
+
+    def clear(self) -> None:
+        """Сбрасывает кэш котировок"""
+        with self._lock:
+            self._quotes.clear()
@@ -1,45 +1,187 @@
+import atexit
 import functools
-from datetime import datetime, timedelta
+import json
+import math
+import queue
+import threading
+import uuid
+from datetime import datetime
 import os
-import logging
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
+import numpy as np
 import pandas as pd
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-rel_log_file_path = os.path.join("C:\\Users\\Asus\\PycharmProjects\\pythonProjectkursov\\logs\\reports.log")
-abs_log_file_path = os.path.abspath(rel_log_file_path)
-logger = logging.getLogger("reports")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(abs_log_file_path, "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+from src import metrics
+from src.cache import cached_report
+from src.log import get_logger
+from src.rollups import RollupStore
+from src.store import fill_missing_labels, operation_dates, period_bounds
+from src.transactions import Transactions
+
+logger = get_logger("reports")
+
+
+DEFAULT_REPORT_FILE = "function_operation_report.txt"
+
+
+def _finite(value: Any) -> Any:
+    """Заменяет NaN и бесконечности во вложенных словарях и списках на None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """Приводит результаты отчетов (DataFrame, даты, числа numpy) к виду, пригодному для JSON:
+    передается в json.dumps(..., default=json_default). Пропуски (NaN, NaT) становятся None"""
+    if isinstance(value, pd.DataFrame):
+        return _finite(value.to_dict(orient="records"))
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, (datetime, pd.Timestamp, pd.Period)):
+        return str(value)
+    if isinstance(value, np.generic):
+        return _finite(value.item())
+    return str(value)
+
+
+def to_json_line(record: Any) -> str:
+    """Строка JSON Lines с результатом отчета. NaN заменяются на None, а allow_nan=False гарантирует,
+    что в вывод не попадут токены NaN и Infinity, которые не принимают строгие парсеры JSON"""
+    return json.dumps(_finite(record), ensure_ascii=False, default=json_default, allow_nan=False)
+
+
+class ReportSink:
+    """
+    Фоновая запись результатов отчетов в файл формата JSON Lines.
+    Результаты сериализуются в момент передачи (последующие изменения объекта вызывающим кодом
+    в файл не попадают), ставятся в очередь и записываются отдельным потоком пачками по batch_size
+    (или раз в flush_interval секунд). Пачка дописывается в конец файла одной записью и сбрасывается
+    на диск через os.fsync, так что стоимость записи не зависит от размера уже накопленного файла.
+    """
+
+    def __init__(self, filename: str, batch_size: int = 100, flush_interval: float = 1.0) -> None:
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"report-sink-{filename}", daemon=True)
+        self._thread.start()
+
+    def submit(self, function_name: str, result: Any) -> None:
+        """Сериализует результат и ставит строку в очередь на запись, не дожидаясь файловой системы"""
+        if self._closed:
+            raise RuntimeError(f"Запись в {self.filename} уже остановлена")
+        record = {"function": function_name, "created": datetime.now().isoformat(), "result": result}
+        try:
+            line = to_json_line(record)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Не удалось сериализовать результат {function_name}: {e}")
+            return
+        self._queue.put(line)
+
+    def flush(self) -> None:
+        """Дожидается записи всех поставленных в очередь результатов (после close() возвращается сразу)"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(self.flush_interval):
+            if not self._thread.is_alive():
+                return
+
+    def close(self) -> None:
+        """Записывает оставшиеся результаты и останавливает поток записи"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        batch: list[str] = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = False
+            if isinstance(item, str):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            self._write(batch)
+            batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _write(self, batch: list[str]) -> None:
+        """Дописывает пачку строк в конец файла и сбрасывает ее на диск"""
+        if not batch:
+            return
+        try:
+            with metrics.span("reports.write", rows=len(batch)):
+                lines = "".join(line + "\n" for line in batch)
+                with open(self.filename, "a", encoding="utf-8") as file:
+                    file.write(lines)
+                    file.flush()
+                    os.fsync(file.fileno())
+            logger.info(f"Записано {len(batch)} результатов в файл {self.filename}")
+        except Exception as e:
+            logger.error(f"Не удалось записать результаты в файл {self.filename}: {e}")
+
+
+_sinks: dict[str, ReportSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_report_sink(filename: str = DEFAULT_REPORT_FILE) -> ReportSink:
+    """Общий ReportSink для файла (создается при первом обращении)"""
+    key = os.path.abspath(filename)
+    with _sinks_lock:
+        if key not in _sinks or _sinks[key]._closed:
+            _sinks[key] = ReportSink(filename)
+        return _sinks[key]
+
+
+@atexit.register
+def close_report_sinks() -> None:
+    """Дописывает результаты всех ReportSink при завершении программы"""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.close()
 
 
 def report_to_file_default(func: Callable) -> Callable:
-    """Записывает в файл результат, который возвращает функция, формирующая отчет."""
+    """Записывает в файл результат, который возвращает функция, формирующая отчет.
+    Запись выполняется в фоне через ReportSink в формате JSON Lines."""
 
     @functools.wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
         result = func(*args, **kwargs)
-        with open("function_operation_report.txt", "w") as file:
-            file.write(str(result))
-        logger.info(f"Записан результат работы функции {func}")
+        get_report_sink(DEFAULT_REPORT_FILE).submit(func.__name__, result)
+        logger.info(f"Передан на запись результат работы функции {func}")
         return result
 
     return wrapper
 
 
-def report_to_file(filename: str = "function_operation_report.txt") -> Callable:
-    """Записывает в переданный файл результат, который возвращает функция, формирующая отчет."""
+def report_to_file(filename: str = DEFAULT_REPORT_FILE) -> Callable:
+    """Записывает в переданный файл результат, который возвращает функция, формирующая отчет.
+    Запись выполняется в фоне через ReportSink в формате JSON Lines."""
 
     def decorator(func: Callable[[tuple[Any, ...], dict[str, Any]], Any]) -> Callable:
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             result = func(*args, **kwargs)
-            with open(filename, "w") as file:
-                file.write(str(result))
-            logger.info(f"Записан результат работы функции {func} в файл {filename}")
+            get_report_sink(filename).submit(func.__name__, result)
+            logger.info(f"Передан на запись результат работы функции {func} в файл {filename}")
             return result
 
         return wrapper
@@ -47,26 +189,141 @@ def report_to_file(filename: str = "function_operation_report.txt") -> Callable:
     return decorator
 
 
+def _monthly_spending(transactions: pd.DataFrame, category: str, start_date: datetime, date: datetime) -> pd.DataFrame:
+    """Суммы числовых столбцов по месяцам для операций категории в заданном периоде"""
+    dates = operation_dates(transactions)
+    mask = (dates >= start_date) & (dates <= date) & (fill_missing_labels(transactions["Категория"]) == category)
+    selected = transactions.loc[mask].select_dtypes("number")
+    return selected.groupby(dates[mask].dt.to_period("M")).sum()
+
+
+class SpendingIndex:
+    """
+    Индекс операций для повторяющихся запросов spending_by_category по одному набору данных.
+    Операции отсортированы по дате и разбиты по месяцам, категории закодированы словарем,
+    так что выборка категории за период — это бинарный поиск и срез.
+    """
+
+    def __init__(self, transactions: pd.DataFrame) -> None:
+        dates = operation_dates(transactions)
+        order = np.argsort(dates.to_numpy(), kind="stable")
+        self.frame = transactions.iloc[order].assign(**{"Дата операции": dates.iloc[order]}).reset_index(drop=True)
+        self.dates = self.frame["Дата операции"].to_numpy()
+
+        months = self.dates.astype("datetime64[M]")
+        self.months, self.month_offsets = np.unique(months, return_index=True)
+
+        codes, categories = pd.factorize(fill_missing_labels(self.frame["Категория"]))
+        self.categories = {str(category): code for code, category in enumerate(categories)}
+        self._positions = np.argsort(codes, kind="stable")
+        self._category_offsets = np.searchsorted(codes[self._positions], np.arange(len(categories) + 1))
+        self._category_dates = self.dates[self._positions]
+        logger.info(f"Построен индекс трат: {len(self.frame)} операций, {len(self.categories)} категорий")
+
+    def month(self, year: int, month: int) -> pd.DataFrame:
+        """Операции за месяц года (срез по разбиению на месяцы)"""
+        position = np.searchsorted(self.months, np.datetime64(f"{year:04d}-{month:02d}", "M"))
+        if position == len(self.months) or self.months[position] != np.datetime64(f"{year:04d}-{month:02d}", "M"):
+            return self.frame.iloc[0:0]
+        end = self.month_offsets[position + 1] if position + 1 < len(self.months) else len(self.frame)
+        return self.frame.iloc[self.month_offsets[position] : end]
+
+    def select(self, category: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Операции категории с датой в интервале [start_date, end_date]"""
+        code = self.categories.get(category)
+        if code is None:
+            return self.frame.iloc[0:0]
+        first, last = self._category_offsets[code], self._category_offsets[code + 1]
+        category_dates = self._category_dates[first:last]
+        left = first + np.searchsorted(category_dates, np.datetime64(start_date), side="left")
+        right = first + np.searchsorted(category_dates, np.datetime64(end_date), side="right")
+        return self.frame.iloc[self._positions[left:right]]
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """Отпечаток для кэша результатов: индекс не меняется после построения, достаточно его идентификатора"""
+        return f"spending-index-{uuid.uuid4().hex}"
+
+
 @report_to_file_default
-def spending_by_category(transactions: pd.DataFrame, category: str, date: Any = None) -> Any:
+@cached_report(skip=lambda transactions, category, date=None: date is None)
+def spending_by_category(
+    transactions: pd.DataFrame | SpendingIndex | Transactions, category: str, date: Any = None
+) -> Any:
     """Функция возвращает траты по заданной категории за последние три месяца
-    (от переданной даты, если дата не передана берет текущую)"""
+    (от переданной даты, если дата не передана берет текущую): суммы числовых столбцов по месяцам,
+    по записи на каждый месяц от первого до последнего месяца с операциями.
+    Вместо DataFrame можно передать SpendingIndex, построенный один раз для набора данных, или Transactions.
+    Результат кэшируется и записывается в файл отчетов"""
+    return calculate_spending_by_category(transactions, category, date)
+
+
+def calculate_spending_by_category(
+    transactions: pd.DataFrame | SpendingIndex | Transactions, category: str, date: Any = None
+) -> Any:
+    """Расчет spending_by_category без кэша и записи в файл отчетов (например, для пакетного запуска)"""
     try:
-        transactions["Дата операции"] = pd.to_datetime(transactions["Дата операции"], format="%d.%m.%Y %H:%M:%S")
-        if date is None:
-            date = datetime.now()
-        else:
-            date = datetime.strptime(date, "%Y.%m.%d")
-        start_date = date - timedelta(days=date.day - 1) - timedelta(days=3 * 30)
-        filtered_transactions = transactions[
-            (transactions["Дата операции"] >= start_date)
-            & (transactions["Дата операции"] <= date)
-            & (transactions["Категория"] == category)
-        ]
-        grouped_transactions = filtered_transactions.groupby(pd.Grouper(key="Дата операции", freq="ME")).sum()
+        start_date, date = period_bounds(date)
+        with metrics.span("reports.filter"):
+            if isinstance(transactions, SpendingIndex):
+                filtered_transactions = transactions.select(category, start_date, date)
+            elif isinstance(transactions, Transactions):
+                mask = transactions.equals("Категория", category)
+                mask &= transactions.between("Дата операции", start_date, date)
+                selected = transactions.take(mask)
+                filtered_transactions = selected.to_frame(["Дата операции", *selected.numeric_columns])
+            else:
+                transactions = transactions.assign(**{"Дата операции": operation_dates(transactions)})
+                filtered_transactions = transactions[
+                    (transactions["Дата операции"] >= start_date)
+                    & (transactions["Дата операции"] <= date)
+                    & (fill_missing_labels(transactions["Категория"]) == category)
+                ]
+        with metrics.span("reports.group", rows=len(filtered_transactions)):
+            # Даты платежей и строковые столбцы не суммируются (в типизированных данных это datetime и category)
+            numeric_columns = filtered_transactions.select_dtypes("number").columns
+            grouped_transactions = (
+                filtered_transactions[["Дата операции", *numeric_columns]]
+                .groupby(pd.Grouper(key="Дата операции", freq="ME"))
+                .sum()
+            )
         logger.info(f"Траты за последние три месяца от {date} по категории {category}")
         return grouped_transactions.to_dict(orient="records")
     except Exception as e:
         print(f"Возникла ошибка {e}")
         logger.error(f"Возникла ошибка {e}")
         return ""
+
+
+@report_to_file_default
+def spending_by_category_rollups(rollups: RollupStore, category: str, date: Any = None) -> Any:
+    """Траты по категории за последние три месяца из готовых агрегатов RollupStore.
+    Агрегаты хранят только сумму и число операций, поэтому записи по месяцам имеют вид
+    {"Сумма операции": ..., "Количество операций": ...}, а не все числовые столбцы, как в spending_by_category"""
+    try:
+        start_date, date = period_bounds(date)
+        logger.info(f"Траты за последние три месяца от {date} по категории {category} из агрегатов")
+        return rollups.spending(category, start_date, date)
+    except Exception as e:
+        print(f"Возникла ошибка {e}")
+        logger.error(f"Возникла ошибка {e}")
+        return ""
+
+
+@report_to_file_default
+def spending_by_category_stream(batches: Iterable[pd.DataFrame], category: str, date: Any = None) -> Any:
+    """Потоковый вариант spending_by_category: складывает помесячные суммы по пачкам операций"""
+    try:
+        start_date, date = period_bounds(date)
+        partials = [_monthly_spending(batch, category, start_date, date) for batch in batches]
+        partials = [partial for partial in partials if not partial.empty]
+        logger.info(f"Потоковый расчет трат за последние три месяца от {date} по категории {category}")
+        if not partials:
+            return []
+        combined = pd.concat(partials).groupby(level=0).sum()
+        months = pd.period_range(combined.index.min(), combined.index.max(), freq="M")
+        return combined.reindex(months, fill_value=0).to_dict(orient="records")
+    except Exception as e:
+        print(f"Возникла ошибка {e}")
+        logger.error(f"Возникла ошибка {e}")
+        return ""
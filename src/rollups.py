@@ -0,0 +1,184 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.analytics import TransactionAnalyzer
+from src.log import get_logger
+from src.store import fill_missing_labels, iter_operations, operation_days
+from src.transactions import Transactions
+
+logger = get_logger("rollups")
+
+MEASURES = ("spend", "payments", "count", "cashback")
+DIMENSIONS = {"category": "Категория", "card": "Номер карты"}
+EXCLUDED_FROM_CASHBACK = "Переводы"
+# Кешбэк накапливается целыми копейками суммы операции (сложение целых чисел в float64 точное),
+# а в рубли кешбэка (1% суммы) переводится делением на CASHBACK_SCALE только при выдаче
+CASHBACK_SCALE = 10000
+
+Rollup = dict[int, dict[str, np.ndarray]]
+
+
+def _day_code(moment: date) -> int:
+    return moment.year * 10000 + moment.month * 100 + moment.day
+
+
+def _add(rollup: Rollup, period: int, key: str, values: np.ndarray) -> None:
+    cells = rollup.setdefault(period, {})
+    if key in cells:
+        cells[key] += values
+    else:
+        cells[key] = values.copy()
+
+
+class RollupStore:
+    """
+    Предрасчитанные агрегаты операций по дням и месяцам в разрезе категорий и карт:
+    сумма операций (spend), сумма платежей (payments), число операций (count) и кешбэк (cashback).
+    Новые операции учитываются через append() без пересчета истории, а запросы за период
+    складывают не больше нескольких десятков готовых ячеек (полные месяцы и дни на границах).
+    """
+
+    def __init__(self, top_n: int = 5) -> None:
+        self.daily: dict[str, Rollup] = {dimension: {} for dimension in DIMENSIONS}
+        self.monthly: dict[str, Rollup] = {dimension: {} for dimension in DIMENSIONS}
+        self.totals = np.zeros(len(MEASURES))
+        self.analyzer = TransactionAnalyzer(top_n)
+        self.version = 0
+        self._id = uuid.uuid4().hex
+
+    @classmethod
+    def from_file(cls, filename: str, chunk_size: int | None = None) -> "RollupStore":
+        """Строит агрегаты за один потоковый проход по выгрузке операций"""
+        rollups = cls()
+        batches = iter_operations(filename) if chunk_size is None else iter_operations(filename, chunk_size)
+        for batch in batches:
+            rollups.append(batch)
+        return rollups
+
+    def append(self, operations: pd.DataFrame | Transactions | list[dict]) -> "RollupStore":
+        """Учитывает новые операции (DataFrame, Transactions или список словарей в формате reading_xlsx)"""
+        if isinstance(operations, Transactions):
+            frame = operations.to_frame()
+        elif isinstance(operations, list):
+            frame = Transactions.from_records(operations).to_frame()
+        else:
+            frame = operations
+        if frame.empty:
+            return self
+
+        days = operation_days(frame["Дата операции"])
+        amounts = np.nan_to_num(frame["Сумма операции"].to_numpy(dtype=float))
+        payments = frame["Сумма платежа"].to_numpy(dtype=float) if "Сумма платежа" in frame else np.zeros(len(frame))
+        payments = np.nan_to_num(payments)
+        categories = fill_missing_labels(frame["Категория"].astype(object))
+        eligible = (amounts < 0) & (categories != EXCLUDED_FROM_CASHBACK).to_numpy()
+        kopecks = np.where(eligible, -np.round(amounts * 100), 0)
+        measures = np.column_stack([amounts, payments, np.ones(len(frame)), kopecks])
+        valid = ~np.isnan(days) if days.dtype.kind == "f" else np.ones(len(frame), dtype=bool)
+
+        for dimension, column in DIMENSIONS.items():
+            if column in frame:
+                values = categories if dimension == "category" else frame[column]
+                self._append_dimension(dimension, values, days, measures, valid)
+        self.totals += measures[valid].sum(axis=0)
+        if "Сумма платежа" in frame:
+            self.analyzer.update(frame)
+        self.version += 1
+        logger.info(f"В агрегаты добавлено {len(frame)} операций")
+        return self
+
+    def _append_dimension(
+        self, dimension: str, column: pd.Series, days: np.ndarray, measures: np.ndarray, valid: np.ndarray
+    ) -> None:
+        """Складывает операции пачки по ячейкам (день, значение столбца) и добавляет их к агрегатам"""
+        codes, keys = pd.factorize(column)
+        known = valid & (codes >= 0)
+        cells, inverse = np.unique(days[known].astype(np.int64) * len(keys) + codes[known], return_inverse=True)
+        sums = np.column_stack(
+            [np.bincount(inverse, weights=measures[known, i], minlength=len(cells)) for i in range(len(MEASURES))]
+        )
+        for cell, values in zip(cells.tolist(), sums):
+            day, code = divmod(cell, len(keys))
+            key = str(keys[code])
+            _add(self.daily[dimension], day, key, values)
+            _add(self.monthly[dimension], day // 100, key, values)
+
+    @property
+    def fingerprint(self) -> str:
+        """Отпечаток для кэша результатов: меняется при каждом append()"""
+        return f"rollups-{self._id}-{self.version}"
+
+    def month(self, year: int, month: int, dimension: str = "category") -> pd.DataFrame:
+        """Агрегаты за месяц года: строки — категории (или карты), столбцы — MEASURES"""
+        cells = self.monthly[dimension].get(year * 100 + month, {})
+        frame = pd.DataFrame.from_dict(cells, orient="index", columns=list(MEASURES))
+        frame["cashback"] /= CASHBACK_SCALE
+        return frame
+
+    def cashback(self, year: int, month: int) -> pd.Series:
+        """Кешбэк по категориям за месяц года (в том же виде, что и расчет по исходным операциям)"""
+        cashback = self.month(year, month)["cashback"]
+        return cashback[cashback != 0].astype(float)
+
+    def total(self, dimension: str, key: str, start: date, end: date) -> dict[str, float]:
+        """Агрегаты значения key (категории или карты) за дни с start по end включительно"""
+        values = np.zeros(len(MEASURES))
+        for rollup, period in self._periods(start, end):
+            cell = rollup[dimension].get(period, {}).get(key)
+            if cell is not None:
+                values += cell
+        values[MEASURES.index("cashback")] /= CASHBACK_SCALE
+        return dict(zip(MEASURES, values.tolist()))
+
+    def _periods(self, start: date, end: date) -> Iterable[tuple[dict[str, Rollup], int]]:
+        """Покрывает интервал дней полными месяцами и отдельными днями на его границах"""
+        day = start
+        while day <= end:
+            month_end = (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            if day.day == 1 and month_end <= end:
+                yield self.monthly, day.year * 100 + day.month
+                day = month_end + timedelta(days=1)
+            else:
+                yield self.daily, _day_code(day)
+                day += timedelta(days=1)
+
+    def spending(self, category: str, start: datetime, end: datetime) -> list[dict]:
+        """
+        Помесячные траты категории за период (границы берутся с точностью до дня):
+        по записи на каждый месяц от первого до последнего месяца с операциями.
+        Конец периода в полночь (как у дат ГГГГ.ММ.ДД в spending_by_category) не включает сам этот день.
+        """
+        months = []
+        end_day = end.date() - timedelta(days=1) if end.time() == datetime.min.time() else end.date()
+        month_start = start.date().replace(day=1)
+        while month_start <= end_day:
+            next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            first = max(month_start, start.date())
+            last = min(next_month - timedelta(days=1), end_day)
+            months.append(self.total("category", category, first, last))
+            month_start = next_month
+        present = [i for i, values in enumerate(months) if values["count"] > 0]
+        if not present:
+            return []
+        return [
+            {"Сумма операции": values["spend"], "Количество операций": int(values["count"])}
+            for values in months[present[0] : present[-1] + 1]
+        ]
+
+    def summary(self, card: str | None = None) -> dict[str, Any]:
+        """
+        Сводка для главной страницы в формате analyze_transactions: сумма платежей, кешбэк
+        и крупнейшие платежи. Для отдельной карты — без списка платежей.
+        """
+        if card is None:
+            total_spent = self.totals[MEASURES.index("payments")]
+            top = self.analyzer.top_transactions()
+        else:
+            cells = (cells.get(card) for cells in self.monthly["card"].values())
+            total_spent = sum(cell[MEASURES.index("payments")] for cell in cells if cell is not None)
+            top = pd.DataFrame()
+        return {"total_spent": total_spent, "cashback": total_spent // 100, "top_5_transactions": top}
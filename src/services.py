@@ -1,72 +1,182 @@
 import json
-import logging
 import re
-from datetime import datetime
-import os
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Iterable
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-rel_log_file_path = os.path.join("C:\\Users\\Asus\\PycharmProjects\\pythonProjectkursov\\logs\\services.log")
-abs_log_file_path = os.path.abspath(rel_log_file_path)
-logger = logging.getLogger("services")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(abs_log_file_path, "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+import numpy as np
+import pandas as pd
 
+from src import metrics
+from src.cache import cached_report
+from src.log import get_logger
+from src.rollups import RollupStore
+from src.store import fill_missing_labels, operation_periods
+from src.transactions import Transactions
 
-def get_profitable_cashback_categories(data: list, year: str, month: str) -> str:
+logger = get_logger("services")
+
+
+def _operations_frame(data: Any) -> pd.DataFrame:
+    """Столбцы, нужные для расчета кешбэка, из списка операций, DataFrame или Transactions"""
+    columns = ["Дата операции", "Категория", "Сумма операции"]
+    if isinstance(data, Transactions):
+        return data.to_frame(columns)
+    if isinstance(data, pd.DataFrame):
+        return data[columns]
+    return pd.DataFrame({column: [x[column] for x in data] for column in columns})
+
+
+def _cashback_by_category(frame: pd.DataFrame, year: int, month: int) -> pd.Series:
+    """
+    Сумма кешбэка по категориям за месяц года.
+    Даты разбираются один раз на весь столбец, отбор идет по целочисленной маске год*100+месяц,
+    а суммы по категориям считаются через np.bincount по кодам категорий.
     """
-    На вход функции поступают данные для анализа, год и месяц.
+    with metrics.span("services.parse_dates", rows=len(frame)):
+        periods = operation_periods(frame["Дата операции"])
+    amounts = frame["Сумма операции"].to_numpy(dtype=float)
+    with metrics.span("services.encode_categories", rows=len(frame)):
+        codes, categories = pd.factorize(fill_missing_labels(frame["Категория"]))
+
+    mask = (periods == year * 100 + month) & (amounts < 0) & (codes >= 0)
+    if "Переводы" in categories:
+        mask &= codes != categories.get_loc("Переводы")
+    selected = int(mask.sum())
+    logger.info(f"Отобрано операций для расчета кешбэка: {selected}, пропущено: {len(frame) - selected}")
+
+    with metrics.span("services.group", rows=selected):
+        sums = np.bincount(codes[mask], weights=-amounts[mask] * 0.01, minlength=len(categories))
+        present = np.bincount(codes[mask], minlength=len(categories)) > 0
+    return pd.Series(sums[present], index=categories[present].astype(str))
+
+
+def _round_kopecks(value: float) -> float:
+    """Округляет сумму до копеек, половину копейки — вверх. Погрешность float меньше 1e-6 сначала отбрасывается,
+    поэтому результат не зависит от порядка суммирования (51.98500000000001 и 51.985 дают 51.99)"""
+    return float(Decimal(repr(round(float(value), 6))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def _sorted_cashback(result: pd.Series) -> dict:
+    """Округляет суммы до копеек и сортирует категории по убыванию кешбэка, при равенстве — по названию,
+    поэтому порядок не зависит от способа расчета.
+    Округление — намеренное изменение формата: раньше в JSON попадали суммы с долями копеек (1.6089 вместо 1.61)"""
+    rounded = [(str(category), _round_kopecks(value)) for category, value in result.items()]
+    return dict(sorted(rounded, key=lambda item: (-item[1], item[0])))
+
+
+def format_cashback(result: pd.Series) -> str:
+    """Приводит результат расчета кешбэка к формату json (суммы округлены до копеек, см. _sorted_cashback)"""
+    return json.dumps(_sorted_cashback(result), ensure_ascii=False)
+
+
+@cached_report()
+def get_profitable_cashback_categories(data: list | Transactions | RollupStore, year: str, month: str) -> str:
+    """
+    На вход функции поступают данные для анализа (список операций, Transactions или RollupStore), год и месяц.
     На выходе — JSON с анализом, сколько на каждой категории можно заработать кешбэка в указанном месяце года,
     в формате:
     {"Категория 1": 1000,
     "Категория 2": 2000,
     "Категория 3": 500}
     """
-    filtered_data = []
-    result = {}
+    result = pd.Series(dtype=float)
 
     pattern_year = re.compile(r"\d{4}")
     pattern_month = re.compile(r"\d{2}")
 
     logger.info("Проверка на корректность введенных данных")
 
-    if isinstance(data, list) and pattern_year.fullmatch(year) and pattern_month.fullmatch(month):
+    if isinstance(data, RollupStore) and pattern_year.fullmatch(year) and pattern_month.fullmatch(month):
+        if 12 >= int(month) > 0:
+            result = data.cashback(int(year), int(month))
+    elif isinstance(data, (list, Transactions)) and pattern_year.fullmatch(year) and pattern_month.fullmatch(month):
         if data and 12 >= int(month) > 0:
+            with metrics.span("services.to_frame", rows=len(data)):
+                frame = _operations_frame(data)
+            result = _cashback_by_category(frame, int(year), int(month))
+    else:
+        logger.error("Передан неверный тип данных")
 
-            for x in data:
-                date_obj = datetime.strptime(x["Дата операции"], "%d.%m.%Y %H:%M:%S")
-                year_part = date_obj.strftime("%Y")
-                month_part = date_obj.strftime("%m")
-
-                logger.info("Проверка операции на совпадение месяца и года для поиска")
-
-                if year_part == year and month_part == month:
+    logger.info("Приводим результат к формату json")
 
-                    logger.info("Добавление подходящих операций в новый список")
+    return format_cashback(result)
 
-                    filtered_data.append(x)
-                    category = x["Категория"]
-                    amount = x["Сумма операции"]
 
-                    if category not in result and amount < 0:
-                        if category != "Переводы":
-                            result[category] = 0.0
+def get_profitable_cashback_categories_stream(batches: Iterable[pd.DataFrame], year: str, month: str) -> str:
+    """
+    Потоковый вариант get_profitable_cashback_categories: принимает пачки операций
+    (например, из src.store.iter_operations) и складывает частичные суммы кешбэка по категориям.
+    """
+    pattern_year = re.compile(r"\d{4}")
+    pattern_month = re.compile(r"\d{2}")
+    result = pd.Series(dtype=float)
 
-                            logger.info("Формирование результата с категориями и подсчет кэшбека")
+    if pattern_year.fullmatch(year) and pattern_month.fullmatch(month) and 12 >= int(month) > 0:
+        for batch in batches:
+            result = result.add(_cashback_by_category(batch, int(year), int(month)), fill_value=0.0)
+    else:
+        logger.error("Передан неверный год или месяц")
 
-                            result[category] += abs(amount * 0.01)
+    return format_cashback(result)
 
-                else:
-                    logger.warning("Дата операции отличается от запроса")
 
-    else:
-        logger.error("Передан неверный тип данных")
+class CashbackCube:
+    """
+    Предрасчитанный куб кешбэка (год, месяц, категория).
+    Строится за один проход по операциям, после чего запросы по любым месяцам
+    отвечаются без повторного просмотра данных.
+    """
 
-    logger.info("Приводим результат к формату json")
+    def __init__(self, data: Any) -> None:
+        frame = _operations_frame(data)
+        periods = operation_periods(frame["Дата операции"])
+        amounts = frame["Сумма операции"].to_numpy(dtype=float)
+        codes, categories = pd.factorize(fill_missing_labels(frame["Категория"]))
+
+        mask = (amounts < 0) & (codes >= 0)
+        if "Переводы" in categories:
+            mask &= codes != categories.get_loc("Переводы")
+
+        self.periods, period_index = np.unique(periods[mask], return_inverse=True)
+        self.categories = [str(category) for category in categories]
+        cells = period_index * len(self.categories) + codes[mask]
+        size = len(self.periods) * len(self.categories)
+        shape = (len(self.periods), len(self.categories))
+        self.cashback = np.bincount(cells, weights=-amounts[mask] * 0.01, minlength=size).reshape(shape)
+        self.counts = np.bincount(cells, minlength=size).reshape(shape)
+        logger.info(f"Построен куб кешбэка: {len(self.periods)} месяцев, {len(self.categories)} категорий")
+
+    def query(self, year: int, month: int) -> pd.Series:
+        """Кешбэк по категориям за месяц года"""
+        position = np.searchsorted(self.periods, year * 100 + month)
+        if position == len(self.periods) or self.periods[position] != year * 100 + month:
+            return pd.Series(dtype=float)
+        present = self.counts[position] > 0
+        return pd.Series(self.cashback[position][present], index=np.array(self.categories, dtype=object)[present])
+
+    def months(self) -> list[tuple[str, str]]:
+        """Все месяцы, в которых есть операции с кешбэком, в виде ("ГГГГ", "ММ")"""
+        return [(f"{period // 100:04d}", f"{period % 100:02d}") for period in self.periods.tolist()]
+
+
+def get_cashback_by_periods(data: Any, periods: Any = None) -> str:
+    """
+    Кешбэк по категориям сразу за несколько месяцев за один проход по данным.
+    periods — список пар ("ГГГГ", "ММ") или None для всех месяцев; data — список операций,
+    DataFrame или уже построенный CashbackCube.
+    На выходе — JSON вида {"2023-03": {"Категория 1": 1000, ...}, ...}
+    """
+    pattern_year = re.compile(r"\d{4}")
+    pattern_month = re.compile(r"\d{2}")
 
-    filtered_result = dict(sorted(result.items(), key=lambda value: value[1], reverse=True))
-    parsed_result = json.dumps(filtered_result, ensure_ascii=False)
+    cube = data if isinstance(data, CashbackCube) else CashbackCube(data)
+    if periods is None:
+        periods = cube.months()
 
-    return parsed_result
+    result = {}
+    for year, month in periods:
+        if not (pattern_year.fullmatch(year) and pattern_month.fullmatch(month) and 12 >= int(month) > 0):
+            logger.error(f"Передан неверный период {year}-{month}")
+            continue
+        result[f"{year}-{month}"] = _sorted_cashback(cube.query(int(year), int(month)))
+    return json.dumps(result, ensure_ascii=False)
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.cache import tag_source
+from src.log import get_logger
+
+logger = get_logger("store")
+
+DATE_COLUMNS = {"Дата операции": "%d.%m.%Y %H:%M:%S", "Дата платежа": "%d.%m.%Y"}
+MISSING_VALUE = "Отсутствует"
+CACHE_VERSION = 1
+CHUNK_SIZE = 50_000
+
+
+def default_cache_dir(filename: str) -> str:
+    """Каталог кэша по умолчанию: рядом с исходным файлом операций"""
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), ".operations_cache")
+
+
+def _cache_path(filename: str, cache_dir: str) -> str:
+    """Путь к кэшу конкретного файла, ключ — абсолютный путь к нему"""
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, key)
+
+
+def _read_source(filename: str) -> pd.DataFrame:
+    """Считывает исходную выгрузку операций (xlsx или csv)"""
+    if filename.lower().endswith(".csv"):
+        return pd.read_csv(filename)
+    return pd.read_excel(filename)
+
+
+def _typed_column(name: str, column: pd.Series) -> pd.Series:
+    """Приводит столбец выгрузки к типизированному виду: даты, числа или словарь категорий"""
+    if name in DATE_COLUMNS and not pd.api.types.is_numeric_dtype(column):
+        parsed = pd.to_datetime(column, format=DATE_COLUMNS[name], errors="coerce")
+        if parsed.notna().sum() == column.notna().sum():
+            return parsed
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_dtype(column):
+        return column
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    return column.where(column.isna(), column.astype(str)).astype("category")
+
+
+def fill_missing_labels(column: pd.Series) -> pd.Series:
+    """
+    Заменяет пропуски строкового столбца (например, категории) на MISSING_VALUE.
+    Так пропуск становится обычным значением, как в списке операций reading_xlsx,
+    и отчеты по списку, DataFrame, Transactions и агрегатам совпадают.
+    """
+    if not column.hasnans:
+        return column
+    if isinstance(column.dtype, pd.CategoricalDtype) and MISSING_VALUE not in column.cat.categories:
+        column = column.cat.add_categories(MISSING_VALUE)
+    return column.fillna(MISSING_VALUE)
+
+
+def to_typed_frame(operations: pd.DataFrame) -> pd.DataFrame:
+    """Переводит сырые данные выгрузки в типизированный столбцовый DataFrame"""
+    return pd.DataFrame({name: _typed_column(name, operations[name]) for name in operations.columns}, copy=False)
+
+
+def operation_days(dates: pd.Series) -> np.ndarray:
+    """
+    Переводит столбец дат операций в целочисленные коды год*10000+месяц*100+день.
+    Строки формата "ДД.ММ.ГГГГ чч:мм:сс" разбираются по позициям символов без strptime
+    (с проверкой разделителей, цифр и допустимости даты и времени),
+    остальные значения — через pd.to_datetime, которая отвергает некорректные строки.
+    """
+    if not pd.api.types.is_datetime64_dtype(dates):
+        values = np.asarray(dates.to_numpy(), dtype=str)
+        if values.dtype.itemsize == 19 * 4:
+            chars = values.view(np.uint32).reshape(len(values), 19)
+            digits = chars[:, [6, 7, 8, 9, 3, 4, 0, 1, 11, 12, 14, 15, 17, 18]].astype(np.int64) - ord("0")
+            days = digits[:, :8] @ np.array([10000000, 1000000, 100000, 10000, 1000, 100, 10, 1])
+            hours, minutes, seconds = (digits[:, [8, 10, 12]] * 10 + digits[:, [9, 11, 13]]).T
+            months = days // 100 % 100
+            separators = chars[:, [2, 5, 10, 13, 16]] == np.array([ord("."), ord("."), ord(" "), ord(":"), ord(":")])
+            if (
+                separators.all()
+                and ((digits >= 0) & (digits <= 9)).all()
+                and ((months >= 1) & (months <= 12)).all()
+                and ((hours <= 23) & (minutes <= 59) & (seconds <= 59)).all()
+            ):
+                first = ((days // 10000 - 1970) * 12 + months - 1).astype("datetime64[M]")
+                month_days = ((first + 1).astype("datetime64[D]") - first.astype("datetime64[D]")).astype(np.int64)
+                if ((days % 100 >= 1) & (days % 100 <= month_days)).all():
+                    return days
+        dates = pd.to_datetime(dates, format=DATE_COLUMNS["Дата операции"])
+    return dates.dt.year.to_numpy() * 10000 + dates.dt.month.to_numpy() * 100 + dates.dt.day.to_numpy()
+
+
+def operation_periods(dates: pd.Series) -> np.ndarray:
+    """Переводит столбец дат операций в целочисленные коды год*100+месяц"""
+    return operation_days(dates) // 100
+
+
+def operation_dates(transactions: pd.DataFrame) -> pd.Series:
+    """Столбец дат операций в виде datetime без изменения исходного DataFrame"""
+    dates = transactions["Дата операции"]
+    if pd.api.types.is_datetime64_dtype(dates):
+        return dates
+    return pd.to_datetime(dates, format=DATE_COLUMNS["Дата операции"])
+
+
+def period_bounds(date: Any = None) -> tuple[datetime, datetime]:
+    """Границы периода отчета по тратам: три месяца до переданной даты в формате ГГГГ.ММ.ДД (или текущей)"""
+    if date is None:
+        date = datetime.now()
+    else:
+        date = datetime.strptime(date, "%Y.%m.%d")
+    start_date = date - timedelta(days=date.day - 1) - timedelta(days=3 * 30)
+    return start_date, date
+
+
+def _write_cache(path: str, frame: pd.DataFrame, stat: os.stat_result) -> None:
+    """Сохраняет столбцы в отдельные .npy файлы и описание кэша в meta.json"""
+    os.makedirs(path, exist_ok=True)
+    generation = f"{stat.st_mtime_ns}-{stat.st_size}"
+    columns = []
+    for i, name in enumerate(frame.columns):
+        column = frame[name]
+        file_name = f"{i}-{generation}.npy"
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            kind = "category"
+            values = column.cat.codes.to_numpy(dtype=np.int32)
+            categories = [str(value) for value in column.cat.categories]
+        else:
+            kind = "datetime" if pd.api.types.is_datetime64_dtype(column) else "numeric"
+            values = column.to_numpy()
+            categories = None
+        np.save(os.path.join(path, file_name), values, allow_pickle=False)
+        columns.append({"name": name, "kind": kind, "file": file_name, "categories": categories})
+
+    meta = {"version": CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "columns": columns}
+    tmp_meta = os.path.join(path, "meta.json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as file:
+        json.dump(meta, file, ensure_ascii=False)
+    os.replace(tmp_meta, os.path.join(path, "meta.json"))
+
+    used = {column["file"] for column in columns} | {"meta.json"}
+    for old_file in os.listdir(path):
+        if old_file not in used:
+            with suppress(OSError):
+                os.remove(os.path.join(path, old_file))
+
+
+def _read_meta(path: str, stat: os.stat_result) -> Any:
+    """Возвращает описание кэша, если он соответствует текущей версии исходного файла"""
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if (meta.get("version"), meta.get("mtime_ns"), meta.get("size")) != (
+        CACHE_VERSION,
+        stat.st_mtime_ns,
+        stat.st_size,
+    ):
+        return None
+    return meta
+
+
+def _load_cache(path: str, meta: dict) -> pd.DataFrame:
+    """Открывает столбцы кэша через memory-map без копирования данных"""
+    data = {}
+    for column in meta["columns"]:
+        values = np.load(os.path.join(path, column["file"]), mmap_mode="r", allow_pickle=False)
+        if column["kind"] == "category":
+            data[column["name"]] = pd.Categorical.from_codes(values, categories=column["categories"])
+        else:
+            data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_operations(filename: str, cache_dir: str | None = None) -> pd.DataFrame:
+    """
+    Загружает выгрузку операций в типизированном виде.
+    Первый вызов разбирает EXCEL/CSV и сохраняет столбцовый кэш, последующие — открывают кэш
+    через memory-map. Кэш пересобирается, если у исходного файла изменились время изменения или размер.
+    Результат помечен версией файла (src.cache.tag_source), поэтому отчеты по нему кэшируются.
+    """
+    stat = os.stat(filename)
+    path = _cache_path(filename, cache_dir or default_cache_dir(filename))
+    meta = _read_meta(path, stat)
+    if meta is not None:
+        try:
+            with metrics.span("store.load_cache"):
+                frame = _load_cache(path, meta)
+            metrics.increment("store.cache_hit")
+            logger.info(f"Операции загружены из кэша {path}")
+            return tag_source(frame, filename)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Кэш {path} поврежден ({e}), пересобираем")
+
+    logger.info(f"Строим кэш операций для {filename}")
+    metrics.increment("store.cache_miss")
+    with metrics.span("store.parse"):
+        frame = to_typed_frame(_read_source(filename))
+    try:
+        _write_cache(path, frame, stat)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить кэш {path}: {e}")
+    return tag_source(frame, filename)
+
+
+class OperationRecords(list):
+    """Список операций в формате reading_xlsx. В отличие от list поддерживает слабые ссылки,
+    поэтому его можно пометить версией исходного файла для кэша результатов"""
+
+
+def to_records(frame: pd.DataFrame) -> list[dict]:
+    """Переводит типизированный DataFrame в список словарей в формате исходной выгрузки"""
+    operations = pd.DataFrame(index=frame.index)
+    for name in frame.columns:
+        column = frame[name]
+        if pd.api.types.is_datetime64_dtype(column):
+            column = column.dt.strftime(DATE_COLUMNS.get(name, "%d.%m.%Y %H:%M:%S"))
+        operations[name] = column.astype(object)
+    operations = operations.where(pd.notnull(operations), MISSING_VALUE)
+    return OperationRecords(operations.to_dict(orient="records"))
+
+
+def _iter_xlsx_rows(filename: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Построчно читает EXCEL-файл в режиме read-only и отдает сырые пачки строк"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) for name in header]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def iter_operations(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Потоково читает выгрузку операций (xlsx или csv) типизированными пачками по chunk_size строк.
+    В памяти одновременно находится только одна пачка.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным")
+    logger.info(f"Потоковое чтение {filename} пачками по {chunk_size} строк")
+    if filename.lower().endswith(".csv"):
+        batches: Iterator[pd.DataFrame] = pd.read_csv(filename, chunksize=chunk_size)
+    else:
+        batches = _iter_xlsx_rows(filename, chunk_size)
+    for batch in batches:
+        metrics.increment("store.stream_rows", len(batch))
+        yield to_typed_frame(batch)
@@ -0,0 +1,148 @@
+import functools
+import hashlib
+import sys
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.log import get_logger
+from src.store import MISSING_VALUE, to_typed_frame
+
+logger = get_logger("transactions")
+
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+
+
+class Transactions:
+    """
+    Компактное столбцовое представление операций вместо списка словарей.
+    Даты хранятся секундами от эпохи (int64, пропуск — MISSING_TIMESTAMP), суммы — float64,
+    строковые столбцы — кодами int32 (-1 — пропуск) со словарем значений.
+    На строку приходится порядка сотни байт против нескольких килобайт у словаря с ключами-строками.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        categories: dict[str, list[str]] | None = None,
+        dates: Iterable[str] = (),
+    ) -> None:
+        self._columns = columns
+        self._categories = categories or {}
+        self._dates = set(dates)
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Столбцы операций разной длины")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "Transactions":
+        """Строит представление из DataFrame (сырого или типизированного, см. src.store.to_typed_frame)"""
+        columns: dict[str, np.ndarray] = {}
+        categories: dict[str, list[str]] = {}
+        dates = []
+        for name, column in to_typed_frame(frame).items():
+            name = str(name)
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                columns[name] = column.cat.codes.to_numpy(dtype=np.int32)
+                categories[name] = [str(value) for value in column.cat.categories]
+            elif pd.api.types.is_datetime64_dtype(column):
+                columns[name] = column.to_numpy().astype("datetime64[s]").view(np.int64)
+                dates.append(name)
+            elif pd.api.types.is_integer_dtype(column):
+                columns[name] = column.to_numpy(dtype=np.int64)
+            else:
+                columns[name] = column.to_numpy(dtype=np.float64)
+        logger.info(f"Построено компактное представление: {len(frame)} операций, {len(columns)} столбцов")
+        return cls(columns, categories, dates)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "Transactions":
+        """Строит представление из списка словарей в формате reading_xlsx ("Отсутствует" — пропуск)"""
+        frame = pd.DataFrame.from_records(list(records))
+        frame = frame.mask(frame.eq(MISSING_VALUE)).infer_objects()
+        return cls.from_frame(frame)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    @property
+    def numeric_columns(self) -> list[str]:
+        """Столбцы сумм и других чисел (без дат и строковых столбцов)"""
+        return [name for name in self._columns if name not in self._categories and not self.is_date(name)]
+
+    def is_date(self, name: str) -> bool:
+        return name in self._dates
+
+    def codes(self, name: str) -> tuple[np.ndarray, list[str]]:
+        """Коды строкового столбца и словарь его значений"""
+        return self._columns[name], self._categories[name]
+
+    def values(self, name: str) -> np.ndarray:
+        """Массив столбца как он хранится: секунды от эпохи, числа или коды"""
+        return self._columns[name]
+
+    def __getitem__(self, name: str) -> pd.Series:
+        """Столбец в виде pandas.Series: даты — datetime64, строки — category"""
+        values = self._columns[name]
+        if name in self._categories:
+            return pd.Series(pd.Categorical.from_codes(values, categories=self._categories[name]), name=name)
+        if self.is_date(name):
+            return pd.Series(values.view("datetime64[s]"), name=name)
+        return pd.Series(values, name=name)
+
+    def to_frame(self, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """Типизированный DataFrame из выбранных (или всех) столбцов без копирования числовых массивов"""
+        names = self.columns if columns is None else list(columns)
+        return pd.DataFrame({name: self[name] for name in names}, copy=False)
+
+    def equals(self, name: str, value: str) -> np.ndarray:
+        """Маска строк, в которых строковый столбец равен value (сравнение кодов, а не строк).
+        Пропуску соответствует MISSING_VALUE, как в списке операций reading_xlsx"""
+        codes, categories = self.codes(name)
+        if value == MISSING_VALUE and value not in categories:
+            return codes < 0
+        if value not in categories:
+            return np.zeros(len(self), dtype=bool)
+        return codes == categories.index(value)
+
+    def between(self, name: str, start: datetime, end: datetime) -> np.ndarray:
+        """Маска строк с датой в интервале [start, end]"""
+        seconds = self._columns[name]
+        first = np.datetime64(start, "s").astype(np.int64)
+        last = np.datetime64(end, "s").astype(np.int64)
+        return (seconds != MISSING_TIMESTAMP) & (seconds >= first) & (seconds <= last)
+
+    def periods(self, name: str = "Дата операции") -> np.ndarray:
+        """Коды год*100+месяц для столбца дат (0 — дата отсутствует)"""
+        seconds = self._columns[name]
+        months = seconds.view("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        return np.where(seconds == MISSING_TIMESTAMP, 0, (months // 12 + 1970) * 100 + months % 12 + 1)
+
+    def take(self, rows: np.ndarray) -> "Transactions":
+        """Подмножество операций по маске или номерам строк"""
+        columns = {name: values[rows] for name, values in self._columns.items()}
+        return Transactions(columns, self._categories, self._dates)
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занимаемая массивами столбцов и словарями значений"""
+        arrays = sum(values.nbytes for values in self._columns.values())
+        dictionaries = sum(sys.getsizeof(value) for values in self._categories.values() for value in values)
+        return arrays + dictionaries
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """Отпечаток содержимого для кэша результатов (считается один раз)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for name, values in self._columns.items():
+            digest.update(name.encode("utf-8"))
+            digest.update(np.ascontiguousarray(values).tobytes())
+            digest.update(repr(self._categories.get(name)).encode("utf-8"))
+        return digest.hexdigest()
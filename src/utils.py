@@ -1,23 +1,59 @@
+from __future__ import annotations
+
 import os
-import logging
-import requests
-from dotenv import load_dotenv
-import pandas as pd
 import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable
+
+from src import metrics
+from src.log import get_logger, log_sampled
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.currency import ExchangeRateService
+    from src.quotes import QuoteProvider
+
+# pandas, requests и dotenv загружаются при первом обращении к функциям, которым они нужны,
+# чтобы hello_person и get_mask_account не платили за их импорт
+exchange_rates: ExchangeRateService | None = None
+quote_provider: QuoteProvider | None = None
+
+# Сколько секунд stock_prices ждет котировки, которых еще нет в кэше
+QUOTE_WAIT = 2.0
+
+logger = get_logger("utils")
+
+
+def get_exchange_rates() -> ExchangeRateService:
+    """Общий сервис курсов валют (создается при первом обращении, ключ API берется из .env)"""
+    global exchange_rates
+    if exchange_rates is None:
+        from dotenv import load_dotenv
+
+        from src.currency import ExchangeRateService
 
-load_dotenv()
-api_key = os.getenv("API_KEY")
+        load_dotenv()
+        exchange_rates = ExchangeRateService(api_key=os.getenv("API_KEY"))
+    return exchange_rates
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-rel_log_file_path = os.path.join("C:\\Users\\Asus\\PycharmProjects\\pythonProjectkursov\\logs\\utils.log")
-abs_log_file_path = os.path.abspath(rel_log_file_path)
-logger = logging.getLogger("utils")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(abs_log_file_path, "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+
+def get_quote_provider() -> QuoteProvider:
+    """Общий кэш котировок: HTTP API, если в .env задан STOCK_API_URL, иначе фиксированные котировки.
+    При создании сразу запускается фоновое обновление, чтобы котировки были в кэше до первого запроса"""
+    global quote_provider
+    if quote_provider is None:
+        from dotenv import load_dotenv
+
+        from src.quotes import HttpQuoteBackend, QuoteProvider, StaticQuoteBackend
+
+        load_dotenv()
+        if os.getenv("STOCK_API_URL"):
+            backend = HttpQuoteBackend(api_key=os.getenv("STOCK_API_KEY"))
+        else:
+            backend = StaticQuoteBackend()
+        quote_provider = QuoteProvider(backend)
+        quote_provider.start()
+    return quote_provider
 
 
 def hello_person(current_time):
@@ -38,13 +74,31 @@ def hello_person(current_time):
         return "Доброй ночи"
 
 
-def reading_xlsx(filename: str) -> Any:
-    """Считывает данные с EXCEL файла и переобразовыввает их в JSON-формат"""
+def reading_xlsx(filename: str, use_cache: bool = True, compact: bool = False) -> Any:
+    """Считывает данные с EXCEL файла и переобразовыввает их в JSON-формат.
+    Существующий файл по умолчанию читается через столбцовый кэш (см. src.store.load_operations).
+    При compact=True вместо списка словарей возвращается компактный src.transactions.Transactions.
+    Список помечен версией файла (src.cache.tag_source), поэтому отчеты по нему кэшируются"""
+    import pandas as pd
+
+    from src.cache import tag_source
+    from src.store import OperationRecords, load_operations, to_records
+    from src.transactions import Transactions
+
     logger.info("Начали считывание информации с EXCEL-файла")
     try:
-        operations = pd.read_excel(filename)
-        operations = operations.where(pd.notnull(operations), operations.fillna("Отсутствует"))
-        file_dict = operations.to_dict(orient="records")
+        with metrics.span("utils.reading_xlsx") as stage:
+            if compact:
+                use_store = use_cache and os.path.isfile(filename)
+                operations = load_operations(filename) if use_store else pd.read_excel(filename)
+                file_dict = Transactions.from_frame(operations)
+            elif use_cache and os.path.isfile(filename):
+                file_dict = tag_source(to_records(load_operations(filename)), filename)
+            else:
+                operations = pd.read_excel(filename)
+                operations = operations.where(pd.notnull(operations), operations.fillna("Отсутствует"))
+                file_dict = tag_source(OperationRecords(operations.to_dict(orient="records")), filename)
+            stage.add_rows(len(file_dict))
         logger.info("Окончили считывание информации с EXCEL-файла")
         return file_dict
     except Exception as e:
@@ -58,22 +112,19 @@ def get_mask_account(transaction_content: int) -> str:
     str_number_card = str(transaction_content)
     if len(str_number_card) < 6:
         return "Ошибка: Неверный номер карты"
-    logger.info("Успешно")
+    log_sampled(logger, "get_mask_account", "Успешно замаскирован номер карты")
     return f"{str_number_card[:4]} ** {str_number_card[-4:]}"
 
 
 def get_convert_amount(currency_code, amount):
-    """Проверяет текущий курс валюты"""
+    """Переводит сумму (или массив сумм) в рубли по текущему курсу валюты.
+    Курс запрашивается один раз за время жизни кэша exchange_rates"""
+    import requests
+
     try:
-        if currency_code == "USD" or currency_code == "EUR":
-            url = f"https://api.apilayer.com/exchangerates_data/convert?to=RUB&from={currency_code}&amount={amount}"
-        headers = {"apikey": api_key}
-        response = requests.get(url, headers=headers)
-        json_result = response.json()
-        rub_amount = json_result["result"]
-        return round(rub_amount, 2)
-
-    except KeyError:
+        return get_exchange_rates().convert(currency_code, amount)
+    except (KeyError, ValueError, requests.RequestException) as e:
+        logger.error(f"Не удалось получить курс {currency_code}: {e}")
         return 0
 
 
@@ -84,36 +135,38 @@ def analyze_transactions(df: pd.DataFrame):
     - Кэшбэк (1 рубль за каждые 100 рублей)
     - Топ-5 транзакций по сумме платежа
     """
+    import pandas as pd
+
     if df.empty:
         return {"total_spent": 0, "cashback": 0, "top_5_transactions": pd.DataFrame()}
 
-    total_spent = df["Сумма платежа"].sum()
-    cashback = total_spent // 100
+    with metrics.span("utils.analyze_transactions", rows=len(df)):
+        total_spent = df["Сумма платежа"].sum()
+        cashback = total_spent // 100
 
-    top_5_transactions = df.nlargest(5, "Сумма платежа")
+        top_5_transactions = df.nlargest(5, "Сумма платежа")
 
     return {"total_spent": total_spent, "cashback": cashback, "top_5_transactions": top_5_transactions}
 
 
-def stock_prices(info):
-    """Подключаемся к API, получаем наименование акции и ее цену, добавляем в словарь info"""
+def analyze_transactions_stream(batches: Iterable[pd.DataFrame], top_n: int = 5) -> dict:
+    """Потоковый вариант analyze_transactions: накапливает сумму и топ транзакций по пачкам"""
+    from src.analytics import TransactionAnalyzer
+
+    analyzer = TransactionAnalyzer(top_n)
+    for batch in batches:
+        analyzer.update(batch)
+    return analyzer.result()
+
+
+def stock_prices(info: dict | None = None, symbols: Iterable[str] | None = None, wait: float | None = QUOTE_WAIT):
+    """Получаем наименования акций и их цены из кэша котировок (см. get_quote_provider).
+    Возвращает копию словаря info с ключом "stock_prices", переданный словарь не изменяется.
+    Котировок, которых нет в кэше, ждем не дольше wait секунд"""
     try:
+        quotes = get_quote_provider().get_quotes(symbols, wait=wait)
         logger.info("Good stocks")
-        data_json = {
-            "data": {
-                "trends": [
-                    {"name": "S&P 500", "price": 4500.50},
-                    {"name": "Dow Jones", "price": 34000.75},
-                    {"name": "NASDAQ", "price": 15000.25},
-                ]
-            }
-        }
-
-        info["stock_prices"] = []
-
-        for trend in data_json["data"]["trends"]:
-            info["stock_prices"].append({"stock": trend["name"], "price": trend["price"]})
-        return info
+        return {**(info or {}), "stock_prices": [{"stock": name, "price": price} for name, price in quotes.items()]}
     except Exception as e:
         logger.error("Everybody has problems with foreign stocks.")
         print(f"We have a problem with stocks, Watson: {e}")
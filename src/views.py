@@ -1,21 +1,119 @@
-import pandas as pd
+from __future__ import annotations
+
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import TYPE_CHECKING, Any, Callable
+
+from src import metrics
 from src.utils import hello_person, get_mask_account, get_convert_amount, analyze_transactions, stock_prices
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def generate_main_page(data: pd.DataFrame, currency_code: str, amount: float, transaction_content: int) -> dict:
-    """Формирует главную страницу приложения с анализом данных и информацией о пользователе."""
-    greeting = hello_person()
-    masked_account = get_mask_account(transaction_content)
-    converted_amount = get_convert_amount(currency_code, amount)
-    transaction_analysis = analyze_transactions(data)
-    stock_pricess = stock_prices()
-
-    main_page_data = {
-        "greeting": greeting,
-        "masked_account": masked_account,
-        "converted_amount": converted_amount,
-        "transaction_analysis": transaction_analysis,
-        "stock_pricess": stock_pricess,
+    from src.analytics import TransactionAnalyzer
+    from src.rollups import RollupStore
+
+SECTION_DEADLINE = 5.0
+
+
+def _main_page_sections(
+    data: pd.DataFrame | TransactionAnalyzer | RollupStore,
+    currency_code: str,
+    amount: float,
+    transaction_content: int,
+    current_time: str | None,
+) -> dict[str, Callable[[], Any]]:
+    """Независимые разделы главной страницы в виде функций без аргументов.
+    Если вместо DataFrame передан TransactionAnalyzer, анализ берется из его накопленного состояния"""
+    if current_time is None:
+        current_time = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+    return {
+        "greeting": lambda: hello_person(current_time),
+        "masked_account": lambda: get_mask_account(transaction_content),
+        "converted_amount": lambda: get_convert_amount(currency_code, amount),
+        "transaction_analysis": lambda: _transaction_analysis(data),
+        # Главная страница не ждет котировки: берет то, что уже есть в кэше, остальное подгрузится в фоне
+        "stock_pricess": lambda: stock_prices(wait=0),
     }
 
+
+def _transaction_analysis(data: pd.DataFrame | TransactionAnalyzer | RollupStore) -> dict:
+    """Анализ транзакций из DataFrame, накопленного состояния TransactionAnalyzer или агрегатов RollupStore"""
+    from src.analytics import TransactionAnalyzer
+    from src.rollups import RollupStore
+
+    if isinstance(data, TransactionAnalyzer):
+        return data.result()
+    if isinstance(data, RollupStore):
+        return data.summary()
+    return analyze_transactions(data)
+
+
+def generate_main_page(
+    data: pd.DataFrame | TransactionAnalyzer | RollupStore,
+    currency_code: str,
+    amount: float,
+    transaction_content: int,
+    current_time: str | None = None,
+) -> dict:
+    """Формирует главную страницу приложения с анализом данных и информацией о пользователе."""
+    sections = _main_page_sections(data, currency_code, amount, transaction_content, current_time)
+    main_page_data = {name: _timed(name, section)[0] for name, section in sections.items()}
+
+    return main_page_data
+
+
+def _timed(name: str, section: Callable[[], Any]) -> tuple[Any, float]:
+    """Выполняет раздел и возвращает результат вместе со временем выполнения"""
+    started = time.perf_counter()
+    with metrics.span(f"views.{name}"):
+        result = section()
+    return result, time.perf_counter() - started
+
+
+def generate_main_page_concurrent(
+    data: pd.DataFrame | TransactionAnalyzer | RollupStore,
+    currency_code: str,
+    amount: float,
+    transaction_content: int,
+    current_time: str | None = None,
+    deadline: float | dict[str, float] = SECTION_DEADLINE,
+    max_workers: int | None = None,
+) -> dict:
+    """
+    Формирует главную страницу, выполняя независимые разделы одновременно в пуле потоков.
+    Каждому разделу отводится deadline секунд (число или словарь по названиям разделов);
+    разделы, не успевшие к сроку или завершившиеся ошибкой, получают значение None.
+    Дополнительно возвращаются "timings" — время каждого раздела и "errors" — причины пропусков.
+    """
+    sections = _main_page_sections(data, currency_code, amount, transaction_content, current_time)
+    deadlines = deadline if isinstance(deadline, dict) else dict.fromkeys(sections, deadline)
+
+    main_page_data: dict[str, Any] = {}
+    timings: dict[str, float] = {}
+    errors: dict[str, str] = {}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(sections))
+    started = time.perf_counter()
+    try:
+        futures = {name: executor.submit(_timed, name, section) for name, section in sections.items()}
+        for name, future in futures.items():
+            remaining = deadlines.get(name, SECTION_DEADLINE) - (time.perf_counter() - started)
+            try:
+                main_page_data[name], timings[name] = future.result(timeout=max(remaining, 0))
+            except TimeoutError:
+                future.cancel()
+                main_page_data[name] = None
+                timings[name] = time.perf_counter() - started
+                errors[name] = "Превышено время ожидания"
+            except Exception as e:
+                main_page_data[name] = None
+                timings[name] = time.perf_counter() - started
+                errors[name] = str(e)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    main_page_data["timings"] = timings
+    main_page_data["errors"] = errors
     return main_page_data
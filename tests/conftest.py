@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="pythonprojectkursov-logs-"))
+
+
+@pytest.fixture(autouse=True)
+def report_file(tmp_path, monkeypatch):
+    """Результаты отчетов пишутся во временный файл, а не в function_operation_report.txt репозитория"""
+    filename = str(tmp_path / "function_operation_report.txt")
+    monkeypatch.setattr("src.reports.DEFAULT_REPORT_FILE", filename)
+    return filename
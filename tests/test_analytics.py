@@ -0,0 +1,133 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.analytics import TransactionAnalyzer, analyze_by_card, mask_card_numbers
+from src.store import load_operations
+from src.utils import analyze_transactions, get_mask_account
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame(
+        {
+            "Дата операции": [f"0{i}.01.2024" for i in range(1, 9)],
+            "Сумма платежа": [500, 1500, 3000, 1200, 7000, 2500, 1500, 100],
+        }
+    )
+
+
+def test_update_matches_full_analysis(transactions):
+    """Накопленный результат совпадает с полным пересчетом"""
+    analyzer = TransactionAnalyzer()
+    for start in range(0, len(transactions), 3):
+        analyzer.update(transactions.iloc[start : start + 3])
+
+    expected = analyze_transactions(transactions)
+    result = analyzer.result()
+    assert result["total_spent"] == expected["total_spent"]
+    assert result["cashback"] == expected["cashback"]
+    pd.testing.assert_frame_equal(
+        result["top_5_transactions"], expected["top_5_transactions"].reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_merge_shards(transactions):
+    """Состояния, посчитанные по разным частям данных, объединяются"""
+    first = TransactionAnalyzer().update(transactions.iloc[:4])
+    second = TransactionAnalyzer().update(transactions.iloc[4:])
+    merged = first.merge(second).result()
+    assert merged["total_spent"] == 17300
+    assert merged["top_5_transactions"]["Дата операции"].tolist() == [
+        "05.01.2024",
+        "03.01.2024",
+        "06.01.2024",
+        "02.01.2024",
+        "07.01.2024",
+    ]
+
+
+def test_state_roundtrip(transactions):
+    """Состояние переживает сериализацию в JSON"""
+    analyzer = TransactionAnalyzer(top_n=3).update(transactions)
+    restored = TransactionAnalyzer.from_dict(json.loads(json.dumps(analyzer.to_dict())))
+    restored.update(pd.DataFrame({"Дата операции": ["09.01.2024"], "Сумма платежа": [9000]}))
+    assert restored.result()["top_5_transactions"]["Сумма платежа"].tolist() == [9000, 7000, 3000]
+    assert restored.count == 9
+
+
+def test_state_of_typed_frame_is_json(tmp_path):
+    """Состояние по выгрузке из load_operations (даты, пропуски, category) сериализуется в JSON"""
+    filename = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["01.12.2021 12:00:00", "15.12.2021 10:30:00"],
+            "Дата платежа": ["01.12.2021", None],
+            "Категория": ["Продукты", "Переводы"],
+            "Кэшбэк": [None, 5.0],
+            "Сумма платежа": [-100.0, 700.0],
+        }
+    ).to_excel(filename, index=False)
+    analyzer = TransactionAnalyzer().update(load_operations(str(filename), cache_dir=str(tmp_path / "cache")))
+    state = json.loads(json.dumps(analyzer.to_dict()))
+    rows = sorted((item["row"] for item in state["top"]), key=lambda row: -row["Сумма платежа"])
+    assert rows[0]["Дата операции"] == "2021-12-15T10:30:00"
+    assert rows[0]["Дата платежа"] is None
+    assert rows[1]["Кэшбэк"] is None
+    restored = TransactionAnalyzer.from_dict(state)
+    assert restored.result()["top_5_transactions"]["Сумма платежа"].tolist() == [700.0, -100.0]
+
+
+def test_empty_analyzer():
+    result = TransactionAnalyzer().result()
+    assert result["total_spent"] == 0
+    assert result["top_5_transactions"].empty
+
+
+@pytest.mark.parametrize("number", [1234567890123456, 123456, 12345, 9876543210987654321])
+def test_mask_card_numbers_matches_get_mask_account(number):
+    """Векторная маскировка совпадает с get_mask_account"""
+    assert mask_card_numbers(pd.Series([str(number)])).tolist() == [get_mask_account(number)]
+
+
+def test_mask_card_numbers_numeric_and_missing():
+    result = mask_card_numbers(pd.Series([1234567890123456, None]))
+    assert result.tolist() == ["1234 ** 3456", "Ошибка: Неверный номер карты"]
+
+
+def test_mask_card_numbers_already_masked():
+    """Номера, замаскированные в выгрузке, не считаются ошибкой"""
+    result = mask_card_numbers(pd.Series(["*7197", "1234567890123456", "123"]))
+    assert result.tolist() == ["*7197", "1234 ** 3456", "Ошибка: Неверный номер карты"]
+
+
+def test_analyze_by_card_skips_missing_amounts():
+    """Операция без суммы платежа не портит итог и не попадает в топ"""
+    transactions = pd.DataFrame(
+        {"Номер карты": ["*7197", "*7197", "*7197", "*4556"], "Сумма платежа": [100.0, None, 300.0, None]}
+    )
+    result = analyze_by_card(transactions)
+    assert result["*7197"]["masked_account"] == "*7197"
+    assert result["*7197"]["total_spent"] == 400.0
+    assert result["*7197"]["cashback"] == 4.0
+    assert result["*7197"]["top_5_transactions"]["Сумма платежа"].tolist() == [300.0, 100.0]
+    assert result["*4556"]["total_spent"] == 0
+    assert result["*4556"]["top_5_transactions"].empty
+
+
+def test_analyze_by_card(transactions):
+    """Результат по каждой карте совпадает с analyze_transactions по ее операциям"""
+    transactions["Номер карты"] = ["1111222233334444", "5555666677778888"] * 4
+    transactions.loc[7, "Номер карты"] = None
+    result = analyze_by_card(transactions, top_n=2)
+
+    assert set(result) == {"1111222233334444", "5555666677778888"}
+    for number, card in result.items():
+        expected = analyze_transactions(transactions[transactions["Номер карты"] == number])
+        assert card["total_spent"] == expected["total_spent"]
+        assert card["cashback"] == expected["cashback"]
+        assert card["top_5_transactions"]["Сумма платежа"].tolist() == (
+            expected["top_5_transactions"]["Сумма платежа"].tolist()[:2]
+        )
+    assert result["1111222233334444"]["masked_account"] == "1111 ** 4444"
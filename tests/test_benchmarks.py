@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import find_regressions, measure
+from benchmarks.synthetic import _format_dates, generate_operations
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_generate_operations_schema():
+    """Синтетическая выгрузка повторяет столбцы data/operations.xlsx"""
+    real = pd.read_excel(os.path.join(PROJECT_DIR, "data", "operations.xlsx"), nrows=5)
+    synthetic = generate_operations(100)
+    assert list(synthetic.columns) == list(real.columns)
+    assert len(synthetic) == 100
+    pd.to_datetime(synthetic["Дата операции"], format="%d.%m.%Y %H:%M:%S")
+
+
+def test_generate_operations_deterministic():
+    pd.testing.assert_frame_equal(generate_operations(500, seed=3), generate_operations(500, seed=3))
+    assert not generate_operations(500, seed=3).equals(generate_operations(500, seed=4))
+
+
+def test_format_dates():
+    """Векторное форматирование дат совпадает с strftime"""
+    seconds = np.array([0, 1640994299, 951782400], dtype=np.int64)
+    expected = [pd.Timestamp(value, unit="s").strftime("%d.%m.%Y %H:%M:%S") for value in seconds]
+    assert _format_dates(seconds, with_time=True).tolist() == expected
+    assert _format_dates(seconds, with_time=False).tolist() == [value[:10] for value in expected]
+
+
+def test_measure_and_regressions():
+    result = measure(lambda: sum(range(1000)), rows=1000, repeat=3)
+    assert set(result) >= {"p50", "p95", "p99", "throughput", "peak_memory"}
+    baseline = {"case@1000": dict(result, p50=result["p50"] / 2)}
+    assert find_regressions({"case@1000": result}, baseline) == [
+        f"case@1000: p50 {result['p50'] / 2:.4g} -> {result['p50']:.4g}"
+    ]
+    assert find_regressions({"case@1000": result}, {}) == []
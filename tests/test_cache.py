@@ -0,0 +1,138 @@
+import os
+import pickle
+
+import pandas as pd
+
+from src.cache import ResultCache, cached_report, dataset_fingerprint
+from src.reports import spending_by_category
+from src.services import get_profitable_cashback_categories
+from src.store import load_operations
+from src.transactions import Transactions
+
+
+class Dataset(list):
+    """Набор операций с готовым отпечатком, как у Transactions или RollupStore"""
+
+    def __init__(self, rows, fingerprint):
+        super().__init__(rows)
+        self.fingerprint = fingerprint
+
+
+def test_dataset_fingerprint():
+    """Отпечаток берется у построенного объекта, содержимое DataFrame и списков не хэшируется"""
+    frame = pd.DataFrame({"Категория": ["Еда", "Техника"], "Сумма операции": [-1.0, -2.0]})
+    records = frame.to_dict(orient="records")
+    assert dataset_fingerprint(Transactions.from_frame(frame)) == Transactions.from_records(records).fingerprint
+    assert dataset_fingerprint(Dataset(records, "v1")) == "v1"
+    assert dataset_fingerprint(frame) is None
+    assert dataset_fingerprint(records) is None
+    assert dataset_fingerprint(iter([frame])) is None
+
+
+def test_cached_report_reuses_result():
+    """Повторный вызов с теми же данными и аргументами не пересчитывается"""
+    calls = []
+
+    @cached_report()
+    def report(data, category):
+        calls.append(category)
+        return [{"category": category, "rows": len(data)}]
+
+    data = Dataset([{"Категория": "Еда"}], "v1")
+    first = report(data, "Еда")
+    first.append("изменено вызывающим кодом")
+    assert report(data, "Еда") == [{"category": "Еда", "rows": 1}]
+    report(data, "Техника")
+    report(Dataset([*data, {"Категория": "Техника"}], "v2"), "Еда")
+    report(list(data), "Еда")
+    report(list(data), "Еда")
+    assert calls == ["Еда", "Техника", "Еда", "Еда", "Еда"]
+
+
+def test_cached_report_skip():
+    """Вызовы, зависящие от текущего времени, не кэшируются"""
+    calls = []
+
+    @cached_report(skip=lambda data, date=None: date is None)
+    def report(data, date=None):
+        calls.append(date)
+        return len(calls)
+
+    data = Dataset([], "v1")
+    assert report(data, "2021.12.31") == report(data, "2021.12.31") == 1
+    assert report(data) == 2
+    assert report(data) == 3
+
+
+def test_cached_report_invalidated_by_source(tmp_path):
+    """Данные без отпечатка кэшируются по версии файла операций, изменение файла сбрасывает кэш"""
+    source = tmp_path / "operations.csv"
+    source.write_text("a\n1\n")
+    calls = []
+
+    @cached_report(source=str(source))
+    def report(data):
+        calls.append(1)
+        return len(calls)
+
+    assert report([1]) == report([1]) == 1
+    source.write_text("a\n1\n2\n")
+    assert report([1]) == 2
+
+
+def test_data_loaded_from_file_is_cached(tmp_path):
+    """Данные из load_operations и reading_xlsx помечены версией файла, и отчеты по ним берутся из кэша"""
+    from src.utils import reading_xlsx
+
+    filename = tmp_path / "operations.xlsx"
+    frame = pd.DataFrame(
+        {
+            "Дата операции": ["15.12.2021 10:30:00", "20.12.2021 12:00:00"],
+            "Категория": ["Еда", "Еда"],
+            "Сумма операции": [-100.0, -200.0],
+        }
+    )
+    frame.to_excel(filename, index=False)
+
+    operations = load_operations(str(filename), cache_dir=str(tmp_path / "cache"))
+    assert dataset_fingerprint(operations) is not None
+    assert dataset_fingerprint(operations.copy()) is None
+    assert dataset_fingerprint(load_operations(str(filename), cache_dir=str(tmp_path / "cache"))) == (
+        dataset_fingerprint(operations)
+    )
+    hits = spending_by_category.__wrapped__.cache.hits
+    spending_by_category(operations, "Еда", "2021.12.31")
+    spending_by_category(operations, "Еда", "2021.12.31")
+    assert spending_by_category.__wrapped__.cache.hits == hits + 1
+
+    records = reading_xlsx(str(filename))
+    hits = get_profitable_cashback_categories.cache.hits
+    assert get_profitable_cashback_categories(records, "2021", "12") == '{"Еда": 3.0}'
+    get_profitable_cashback_categories(records, "2021", "12")
+    assert get_profitable_cashback_categories.cache.hits == hits + 1
+
+    fingerprint = dataset_fingerprint(records)
+    records.append(dict(records[0]))
+    assert dataset_fingerprint(records) != fingerprint
+    frame.assign(**{"Сумма операции": [-100.0, -300.0]}).to_excel(filename, index=False)
+    assert dataset_fingerprint(reading_xlsx(str(filename), use_cache=False)) != fingerprint
+
+
+def test_result_cache_evicts_by_size():
+    """LRU вытесняет самые старые значения при превышении объема"""
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345"
+    assert cache.size == 10
+
+
+def test_result_cache_disk_tier(tmp_path):
+    """Значения с диска доступны новому экземпляру кэша"""
+    ResultCache(disk_dir=str(tmp_path)).put("key", pickle.dumps([1, 2]))
+    cache = ResultCache(disk_dir=str(tmp_path))
+    assert pickle.loads(cache.get("key")) == [1, 2]
+    assert os.listdir(tmp_path) == ["key.pkl"]
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from src import utils
+from src.currency import ExchangeRateService
+
+RATES = {"USD": 90.5, "EUR": 98.25}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Заглушка API курсов валют"""
+
+    requests_log: list = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.requests_log.append((self.headers.get("apikey"), query["from"][0]))
+        currency_code = query["from"][0]
+        if currency_code in RATES:
+            body = {"success": True, "result": RATES[currency_code] * float(query["amount"][0])}
+        else:
+            body = {"success": False, "error": {"code": "invalid_from_currency"}}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.requests_log = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_is_cached(stub_url):
+    """Курс валюты запрашивается один раз за время жизни кэша"""
+    service = ExchangeRateService(api_key="key", base_url=stub_url)
+    assert service.convert("USD", 100) == 9050.0
+    assert service.convert("USD", 2) == 181.0
+    assert StubHandler.requests_log == [("key", "USD")]
+
+
+def test_rate_expires(stub_url):
+    """Устаревший курс запрашивается заново"""
+    service = ExchangeRateService(base_url=stub_url, ttl=0)
+    service.get_rate("EUR")
+    service.get_rate("EUR")
+    assert len(StubHandler.requests_log) == 2
+
+
+def test_convert_many_amounts(stub_url):
+    """Массив сумм пересчитывается по одному курсу"""
+    service = ExchangeRateService(base_url=stub_url)
+    result = service.convert("EUR", [1, 10, 0.4])
+    np.testing.assert_allclose(result, [98.25, 982.5, 39.3])
+    assert len(StubHandler.requests_log) == 1
+
+
+def test_get_rates_async(stub_url):
+    """Курсы нескольких валют запрашиваются одновременно"""
+    service = ExchangeRateService(base_url=stub_url)
+    rates = asyncio.run(service.get_rates_async(["USD", "EUR", "USD", "RUB"]))
+    assert rates == {"USD": 90.5, "EUR": 98.25, "RUB": 1.0}
+    assert sorted(code for _, code in StubHandler.requests_log) == ["EUR", "USD"]
+
+
+def test_get_convert_amount_unknown_currency(stub_url, monkeypatch):
+    """Ошибка API приводит к нулевой сумме"""
+    monkeypatch.setattr(utils, "exchange_rates", ExchangeRateService(base_url=stub_url))
+    assert utils.get_convert_amount("XXX", 100) == 0
+    assert utils.get_convert_amount("USD", 100) == 9050.0
@@ -0,0 +1,10 @@
+from benchmarks.bench_import import measure
+
+IMPORT_TIME_LIMIT = 0.2
+
+
+def test_light_entry_points_do_not_load_heavy_modules():
+    """hello_person и get_mask_account не тянут pandas, numpy, requests и dotenv"""
+    elapsed, heavy = measure(runs=3)
+    assert heavy == []
+    assert elapsed < IMPORT_TIME_LIMIT, f"Запуск занял {elapsed * 1000:.0f} мс"
@@ -0,0 +1,34 @@
+import logging
+
+from src.log import configure_logging, get_logger, log_dir, log_sampled, shutdown_logging
+
+
+def test_get_logger_writes_through_queue(tmp_path):
+    """Записи попадают в файл модуля в настроенном каталоге"""
+    previous = log_dir()
+    configure_logging(str(tmp_path))
+    try:
+        logger = get_logger("test_log")
+        logger.info("первая запись")
+        get_logger("test_log_other").info("чужая запись")
+        assert get_logger("test_log") is logger
+        assert len(logger.handlers) == 1
+        shutdown_logging()
+        assert (tmp_path / "test_log.log").read_text(encoding="utf-8").endswith("test_log - INFO: первая запись\n")
+        assert "чужая" not in (tmp_path / "test_log.log").read_text(encoding="utf-8")
+    finally:
+        configure_logging(previous)
+        get_logger("test_log")
+
+
+def test_log_sampled(caplog):
+    """Частое событие логируется только первый и каждый every-й раз"""
+    logger = logging.getLogger("test_log_sampled")
+    with caplog.at_level(logging.INFO, logger="test_log_sampled"):
+        for _ in range(25):
+            log_sampled(logger, "test_log_sampled", "событие", every=10)
+    assert [record.getMessage() for record in caplog.records] == [
+        "событие (повторений: 1)",
+        "событие (повторений: 10)",
+        "событие (повторений: 20)",
+    ]
@@ -0,0 +1,151 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from src import main as batch
+from src.main import BatchRunner, load_jobs, run_batch
+
+
+@pytest.fixture
+def operations_file(tmp_path):
+    data = {
+        "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00", "15.11.2021 08:30:00"],
+        "Номер карты": ["*7197", "*7197", "*4556"],
+        "Сумма операции": [-160.89, -64.0, -1000.0],
+        "Сумма платежа": [-160.89, -64.0, -1000.0],
+        "Категория": ["Супермаркеты", "Супермаркеты", "Транспорт"],
+    }
+    filename = tmp_path / "operations.csv"
+    pd.DataFrame(data).to_csv(filename, index=False)
+    return str(filename)
+
+
+JOBS = [
+    {"report": "cashback", "year": "2021", "month": "12"},
+    {"report": "spending", "category": "Супермаркеты", "date": "2022.01.31"},
+    {"month": "12", "year": "2021", "report": "cashback"},
+    {"report": "card", "card": "*4556"},
+    {"report": "card"},
+    {"report": "unknown"},
+]
+
+
+def test_load_jobs():
+    """Задания читаются и из JSON Lines, и из JSON-массива"""
+    lines = "\n".join(json.dumps(job, ensure_ascii=False) for job in JOBS[:2]) + "\n\n"
+    assert load_jobs(io.StringIO(lines)) == JOBS[:2]
+    assert load_jobs(io.StringIO(json.dumps(JOBS[:2]))) == JOBS[:2]
+
+
+def test_run_batch_streams_json_lines(operations_file):
+    """Каждому заданию соответствует строка результата, ошибки не прерывают пакет"""
+    output = io.StringIO()
+    errors = run_batch(operations_file, JOBS, output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert errors == 2
+    assert [record["job"] for record in records] == JOBS
+    assert records[0]["result"] == {"Супермаркеты": 2.25}
+    assert records[2]["result"] == records[0]["result"]
+    assert records[1]["result"][-1]["Сумма операции"] == pytest.approx(-224.89)
+    assert records[3]["result"]["total_spent"] == -1000.0
+    assert records[3]["result"]["top_5_transactions"][0]["Категория"] == "Транспорт"
+    assert "card" in records[4]["error"]
+    assert "unknown" in records[5]["error"]
+
+
+def test_malformed_jobs_do_not_abort_batch(operations_file, monkeypatch):
+    """Задание не в виде объекта и непредвиденная ошибка задания попадают в его запись"""
+    from src import analytics
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("сбой")
+
+    monkeypatch.setattr(analytics, "analyze_by_card", broken)
+    output = io.StringIO()
+    jobs = ["oops", [1, 2], {"report": "card", "card": "*4556"}, JOBS[0]]
+    errors = run_batch(operations_file, jobs, output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert errors == 3
+    assert [record["job"] for record in records] == jobs
+    assert "str" in records[0]["error"]
+    assert "сбой" in records[2]["error"]
+    assert records[3]["result"] == {"Супермаркеты": 2.25}
+
+
+def test_shared_structures_built_once(operations_file, monkeypatch):
+    """Выгрузка разбирается один раз, общие структуры и одинаковые задания не пересчитываются"""
+    from src import analytics, services, store
+
+    calls = {"load": 0, "cube": 0, "cards": 0}
+    load_operations = store.load_operations
+    cube = services.CashbackCube
+    analyze_by_card = analytics.analyze_by_card
+
+    def counting(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(store, "load_operations", counting("load", load_operations))
+    monkeypatch.setattr(services, "CashbackCube", counting("cube", cube))
+    monkeypatch.setattr(analytics, "analyze_by_card", counting("cards", analyze_by_card))
+
+    jobs = JOBS[:4] + [{"report": "cashback", "year": "2021", "month": "11"}, {"report": "card", "card": "*7197"}]
+    run_batch(operations_file, jobs, io.StringIO())
+    assert calls == {"load": 1, "cube": 1, "cards": 1}
+
+
+def test_runner_reuses_results(operations_file):
+    from src.store import load_operations
+
+    runner = BatchRunner(load_operations(operations_file))
+    first = runner.run_job({"report": "card", "card": "*7197"})
+    assert runner.run_job({"card": "*7197", "report": "card"}) is first
+
+
+def test_main_cli(operations_file, tmp_path):
+    jobs_file = tmp_path / "jobs.jsonl"
+    jobs_file.write_text(json.dumps(JOBS[0]) + "\n", encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    assert batch.main([operations_file, str(jobs_file), "--output", str(output)]) == 0
+    assert json.loads(output.read_text(encoding="utf-8"))["result"] == {"Супермаркеты": 2.25}
+    assert batch.main([operations_file, str(jobs_file), "-o", str(output)]) == 0
+
+
+def strict_loads(line):
+    """Разбор JSON без расширений NaN/Infinity, как у jq и других строгих парсеров"""
+
+    def reject(token):
+        raise ValueError(f"Недопустимый токен {token}")
+
+    return json.loads(line, parse_constant=reject)
+
+
+def test_output_is_strict_json(tmp_path):
+    """Пропуски в строках топа (Кэшбэк, MCC) выводятся как null, а не как NaN"""
+    filename = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00"],
+            "Дата платежа": ["31.12.2021", None],
+            "Номер карты": ["*7197", "*7197"],
+            "Сумма операции": [-160.89, -64.0],
+            "Сумма платежа": [-160.89, -64.0],
+            "Кэшбэк": [None, 1.0],
+            "MCC": [5411.0, None],
+            "Категория": ["Супермаркеты", "Супермаркеты"],
+        }
+    ).to_excel(filename, index=False)
+    output = io.StringIO()
+    assert run_batch(str(filename), [{"report": "card", "card": "*7197"}], output) == 0
+    record = strict_loads(output.getvalue())
+    rows = record["result"]["top_5_transactions"]
+    assert [row["Кэшбэк"] for row in rows] == [1.0, None]
+    assert [row["MCC"] for row in rows] == [None, 5411.0]
+    assert rows[0]["Дата платежа"] is None
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from src import metrics
+from src.services import get_profitable_cashback_categories
+from src.transactions import Transactions
+
+
+@pytest.fixture
+def enabled_metrics():
+    """Включает сбор метрик на время теста"""
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_metrics_collect_nothing():
+    """Без включения метрик этапы и счетчики не записываются"""
+    metrics.reset()
+    with metrics.span("stage", rows=10) as stage:
+        stage.add_rows(5)
+        metrics.increment("event")
+    assert metrics.snapshot() == {"spans": {}, "counters": {}}
+
+
+def test_span_and_counters(enabled_metrics):
+    """Этапы накапливают число вызовов, время и строки"""
+    with metrics.span("stage", rows=10):
+        pass
+    with metrics.span("stage") as stage:
+        stage.add_rows(5)
+    metrics.increment("event")
+    metrics.increment("event", 2)
+
+    @metrics.timed("decorated")
+    def work():
+        return "готово"
+
+    assert work() == "готово"
+    data = metrics.snapshot()
+    assert data["spans"]["stage"]["calls"] == 2
+    assert data["spans"]["stage"]["rows"] == 15
+    assert data["spans"]["stage"]["seconds"] >= data["spans"]["stage"]["max_seconds"] >= 0
+    assert data["spans"]["decorated"]["calls"] == 1
+    assert data["counters"] == {"event": 3}
+
+
+def test_export(enabled_metrics):
+    """Метрики выгружаются в JSON и в текстовом формате Prometheus"""
+    with metrics.span("stage", rows=3):
+        pass
+    metrics.increment("cache.hit")
+
+    assert json.loads(metrics.export_json())["counters"] == {"cache.hit": 1}
+    text = metrics.export_prometheus()
+    assert "# TYPE bank_app_stage_calls_total counter" in text
+    assert 'bank_app_stage_rows_total{stage="stage"} 3' in text
+    assert 'bank_app_events_total{event="cache.hit"} 1' in text
+
+
+def test_profile():
+    """Профилирование возвращает результат функции и отчет о времени и памяти"""
+    result, report = metrics.profile(sorted, list(range(1000, 0, -1)), top=5)
+    assert result[:3] == [1, 2, 3]
+    assert report["seconds"] >= 0
+    assert report["peak_memory"] > 0
+    assert "function calls" in report["profile"]
+
+
+def test_instrumented_cashback(enabled_metrics):
+    """Расчет кэшбэка записывает этапы с числом строк и промах кэша результатов"""
+    data = [
+        {"Дата операции": "15.03.2023 10:15:00", "Категория": "Еда", "Сумма операции": -120.0},
+        {"Дата операции": "25.03.2023 12:30:00", "Категория": "Техника", "Сумма операции": -500.0},
+        {"Дата операции": "25.04.2023 12:30:00", "Категория": "Техника", "Сумма операции": -77.0},
+    ]
+    transactions = Transactions.from_records(data)
+    get_profitable_cashback_categories.cache.clear()
+    get_profitable_cashback_categories(transactions, "2023", "03")
+    get_profitable_cashback_categories(transactions, "2023", "03")
+
+    data = metrics.snapshot()
+    assert data["spans"]["services.parse_dates"]["rows"] == 3
+    assert data["spans"]["services.group"]["rows"] == 2
+    assert data["counters"]["cache.miss"] == 1
+    assert data["counters"]["cache.hit"] == 1
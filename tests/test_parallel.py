@@ -0,0 +1,77 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.parallel import ParallelBackend, parallel_report
+from src.reports import spending_by_category_stream
+from src.services import get_profitable_cashback_categories
+from src.utils import analyze_transactions
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame(
+        {
+            "Дата операции": [
+                "15.03.2023 10:15:00",
+                "20.03.2023 14:00:00",
+                "25.04.2023 12:30:00",
+                "05.03.2023 18:00:00",
+                "06.02.2023 18:00:00",
+                "07.03.2023 09:00:00",
+            ],
+            "Номер карты": ["*1111", "*2222", "*1111", "*2222", "*1111", "*2222"],
+            "Категория": ["Еда", "Еда", "Техника", "Переводы", "Еда", "Техника"],
+            "Сумма операции": [-120.0, -250.0, -500.0, -100.0, -300.0, -40.0],
+            "Сумма платежа": [120.0, 250.0, 500.0, 100.0, 300.0, 40.0],
+        }
+    )
+
+
+@pytest.mark.parametrize("shard_by", ["month", "card", None])
+def test_parallel_reports_match_sequential(transactions, shard_by):
+    """Параллельные отчеты совпадают с последовательным расчетом"""
+    records = transactions.to_dict(orient="records")
+    with ParallelBackend(transactions, workers=2, shard_by=shard_by) as backend:
+        assert backend.cashback("2023", "03") == get_profitable_cashback_categories(records, "2023", "03")
+        assert backend.spending_by_category("Еда", "2023.03.31") == spending_by_category_stream(
+            iter([transactions]), "Еда", "2023.03.31"
+        )
+        result = backend.analyze_transactions(top_n=5)
+
+    expected = analyze_transactions(transactions)
+    assert result["total_spent"] == expected["total_spent"]
+    pd.testing.assert_frame_equal(result["top_5_transactions"], expected["top_5_transactions"])
+
+
+def test_parallel_report(transactions):
+    result = parallel_report(transactions, "cashback", "2023", "03", workers=2)
+    assert json.loads(result) == {"Еда": 3.7, "Техника": 0.4}
+
+
+@pytest.mark.parametrize("shard_by, column", [("month", "Дата операции"), ("card", "Номер карты")])
+def test_shards_split_at_key_boundaries(transactions, shard_by, column):
+    """Все операции одного месяца (карты) попадают в одну часть"""
+    with ParallelBackend(transactions, workers=4, shard_by=shard_by) as backend:
+        shards = backend._shards()
+        keys = backend.frame[column].str[3:10] if shard_by == "month" else backend.frame[column]
+    assert shards[0][0] == 0 and shards[-1][1] == len(transactions)
+    seen: set = set()
+    for start, end in shards:
+        shard_keys = set(keys.iloc[start:end])
+        assert not shard_keys & seen
+        seen |= shard_keys
+
+
+def test_parallel_report_without_cards(transactions):
+    """Для анализа транзакций столбец номеров карт не нужен"""
+    result = parallel_report(transactions.drop(columns="Номер карты"), "analyze_transactions", workers=2)
+    assert result["total_spent"] == transactions["Сумма платежа"].sum()
+
+
+def test_unknown_shard_key(transactions):
+    with pytest.raises(ValueError):
+        ParallelBackend(transactions, shard_by="day")
+    with pytest.raises(ValueError):
+        ParallelBackend(transactions.drop(columns="Номер карты"), shard_by="card")
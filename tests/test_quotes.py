@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.quotes import HttpQuoteBackend, QuoteProvider, StaticQuoteBackend
+
+PRICES = {"AAPL": 190.5, "MSFT": 410.25, "GOOG": 140.0}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Заглушка API котировок"""
+
+    requests_log: list = []
+    delay = 0.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        symbols = parse_qs(urlparse(self.path).query)["symbols"][0].split(",")
+        self.requests_log.append((self.headers.get("apikey"), symbols))
+        trends = [{"name": symbol, "price": PRICES[symbol]} for symbol in symbols if symbol in PRICES]
+        payload = json.dumps({"data": {"trends": trends}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.requests_log = []
+    StubHandler.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_backend_batches_symbols(stub_url):
+    """Инструменты запрашиваются пачками, а не по одному"""
+    backend = HttpQuoteBackend(api_key="key", base_url=stub_url, batch_size=2)
+    assert backend.fetch(["AAPL", "MSFT", "GOOG", "UNKNOWN"]) == PRICES
+    assert StubHandler.requests_log == [("key", ["AAPL", "MSFT"]), ("key", ["GOOG", "UNKNOWN"])]
+
+
+def test_http_backend_requires_url(monkeypatch):
+    monkeypatch.delenv("STOCK_API_URL", raising=False)
+    with pytest.raises(ValueError):
+        HttpQuoteBackend()
+
+
+def test_quotes_are_cached(stub_url):
+    """Свежие котировки берутся из кэша, все отсутствующие запрашиваются одним запросом"""
+    provider = QuoteProvider(HttpQuoteBackend(base_url=stub_url), symbols=["AAPL", "MSFT"])
+    assert provider.get_quotes() == {"AAPL": 190.5, "MSFT": 410.25}
+    assert provider.get_quotes(["MSFT"]) == {"MSFT": 410.25}
+    assert StubHandler.requests_log == [("", ["AAPL", "MSFT"])]
+
+
+def test_stale_quotes_returned_while_revalidating(stub_url):
+    """Устаревшая котировка отдается сразу, а обновляется в фоне"""
+    provider = QuoteProvider(HttpQuoteBackend(base_url=stub_url), symbols=["AAPL"], ttl=0.05)
+    assert provider.get_quotes() == {"AAPL": 190.5}
+    time.sleep(0.1)
+    StubHandler.delay = 0.5
+    started = time.perf_counter()
+    assert provider.get_quotes() == {"AAPL": 190.5}
+    assert time.perf_counter() - started < 0.3
+    for event in provider.refresh():
+        event.wait()
+    assert len(StubHandler.requests_log) == 2
+
+
+def test_missing_quotes_wait_is_bounded(stub_url):
+    """Если котировок еще нет, ждем их не дольше wait, затем они появляются в кэше"""
+    StubHandler.delay = 0.5
+    provider = QuoteProvider(HttpQuoteBackend(base_url=stub_url), symbols=["AAPL"])
+    started = time.perf_counter()
+    assert provider.get_quotes(wait=0.05) == {}
+    assert time.perf_counter() - started < 0.3
+    assert provider.get_quotes() == {"AAPL": 190.5}
+    assert len(StubHandler.requests_log) == 1
+
+
+def test_backend_errors_keep_cache():
+    """Ошибка источника не удаляет ранее полученные котировки"""
+
+    class FlakyBackend(StaticQuoteBackend):
+        fail = False
+
+        def fetch(self, symbols):
+            if self.fail:
+                raise ConnectionError("нет связи")
+            return super().fetch(symbols)
+
+    backend = FlakyBackend()
+    provider = QuoteProvider(backend, ttl=0, stale_ttl=60)
+    assert provider.get_quotes(["NASDAQ"]) == {"NASDAQ": 15000.25}
+    backend.fail = True
+    assert provider.get_quotes(["NASDAQ"]) == {"NASDAQ": 15000.25}
+
+
+def test_background_refresher():
+    """Периодическое обновление заполняет кэш без участия вызывающего кода"""
+    provider = QuoteProvider(StaticQuoteBackend({"AAPL": 1.0}), symbols=["AAPL"])
+    provider.start(interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while not provider._quotes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        provider.stop()
+    assert provider.get_quotes(wait=0) == {"AAPL": 1.0}
@@ -1,6 +1,19 @@
+import json
+import os
+
 import pytest
 import pandas as pd
-from src.reports import spending_by_category
+from src.store import load_operations
+from src.transactions import Transactions
+from src.reports import (
+    ReportSink,
+    SpendingIndex,
+    get_report_sink,
+    report_to_file,
+    report_to_file_default,
+    spending_by_category,
+    spending_by_category_stream,
+)
 
 
 @pytest.fixture
@@ -24,3 +37,136 @@ def test_spending_by_category_with_date(sample_data):
     """ Тестирование функции с указанной датой и категорией "Продукты" """
     result = spending_by_category(sample_data, "Продукты", "30.12.2021 17:50:30")
     assert len(result) == 0
+
+
+def test_spending_by_category_stream(sample_data):
+    """Тестирование потокового режима: суммы по месяцам складываются из пачек"""
+    batches = [sample_data.iloc[:2], sample_data.iloc[2:]]
+    result = spending_by_category_stream(iter(batches), "Продукты", "2022.01.31")
+    assert result == [{"Сумма": 300}, {"Сумма": 150}]
+
+
+def test_spending_by_category_does_not_modify_input(sample_data):
+    """Функция не должна изменять переданный DataFrame"""
+    original = sample_data.copy()
+    spending_by_category(sample_data, "Продукты", "2022.01.31")
+    pd.testing.assert_frame_equal(sample_data, original)
+
+
+@pytest.mark.parametrize("category", ["Продукты", "Транспорт", "Одежда"])
+def test_spending_index_matches_dataframe(sample_data, category):
+    """Ответ через индекс совпадает с расчетом по DataFrame"""
+    index = SpendingIndex(sample_data)
+    assert spending_by_category(index, category, "2022.02.28") == spending_by_category(
+        sample_data, category, "2022.02.28"
+    )
+
+
+def test_spending_schema_is_the_same_for_all_inputs(sample_data):
+    """DataFrame, SpendingIndex, Transactions и поток пачек дают записи одного вида"""
+    expected = spending_by_category(sample_data, "Продукты", "2022.02.28")
+    assert expected == [{"Сумма": 300}, {"Сумма": 150}]
+    assert spending_by_category(SpendingIndex(sample_data), "Продукты", "2022.02.28") == expected
+    assert spending_by_category(Transactions.from_frame(sample_data), "Продукты", "2022.02.28") == expected
+    assert spending_by_category_stream(iter([sample_data]), "Продукты", "2022.02.28") == expected
+
+
+def test_spending_index_month(sample_data):
+    """Разбиение индекса по месяцам"""
+    index = SpendingIndex(sample_data)
+    assert index.month(2021, 12)["Сумма"].tolist() == [100, 200, 50]
+    assert index.month(2022, 3).empty
+
+
+def test_report_to_file_writes_json_lines(tmp_path):
+    """Результаты пишутся в фоне построчно в формате JSON"""
+    filename = str(tmp_path / "report.jsonl")
+
+    @report_to_file(filename)
+    def report(value):
+        return {"value": value, "rows": pd.DataFrame({"Сумма": [value]})}
+
+    assert report(1)["value"] == 1
+    report(2)
+    get_report_sink(filename).flush()
+
+    with open(filename, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["function"] for record in records] == ["report", "report"]
+    assert records[1]["result"] == {"value": 2, "rows": [{"Сумма": 2}]}
+
+
+def test_report_sink_batches_and_closes(tmp_path):
+    """Пачка записывается при закрытии, временные файлы не остаются, flush после закрытия не блокируется"""
+    filename = str(tmp_path / "report.jsonl")
+    sink = ReportSink(filename, batch_size=10, flush_interval=60)
+    for value in range(3):
+        sink.submit("report", value)
+    assert not os.path.exists(filename)
+    sink.close()
+
+    with open(filename, encoding="utf-8") as file:
+        assert [json.loads(line)["result"] for line in file] == [0, 1, 2]
+    assert os.listdir(tmp_path) == ["report.jsonl"]
+    with pytest.raises(RuntimeError):
+        sink.submit("report", 3)
+    sink.flush()
+
+
+def test_report_sink_keeps_result_at_submit_time(report_file):
+    """Изменения результата после вызова отчета не попадают в файл"""
+
+    @report_to_file_default
+    def report():
+        return [{"a": 1}]
+
+    result = report()
+    result[0]["a"] = 999
+    result.append({"b": 2})
+    get_report_sink(report_file).close()
+    with open(report_file, encoding="utf-8") as file:
+        assert [json.loads(line)["result"] for line in file] == [[{"a": 1}]]
+
+
+def test_report_sink_writes_missing_values_as_null(tmp_path):
+    """NaN в результате записывается как null, а не как недопустимый в JSON токен NaN"""
+    filename = str(tmp_path / "report.jsonl")
+    sink = ReportSink(filename)
+    sink.submit("report", {"total": float("nan"), "rows": pd.DataFrame({"a": [1.0, None]})})
+    sink.close()
+    with open(filename, encoding="utf-8") as file:
+        line = file.read()
+    assert "NaN" not in line
+    assert json.loads(line)["result"] == {"total": None, "rows": [{"a": 1.0}, {"a": None}]}
+
+
+def test_report_sink_appends_batches(tmp_path):
+    """Каждая пачка дописывается в конец файла, ранее записанные строки сохраняются"""
+    filename = str(tmp_path / "report.jsonl")
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write('{"function": "old", "result": -1}\n')
+    sink = ReportSink(filename, batch_size=2, flush_interval=60)
+    for value in range(5):
+        sink.submit("report", value)
+    sink.flush()
+    with open(filename, encoding="utf-8") as file:
+        assert [json.loads(line)["result"] for line in file] == [-1, 0, 1, 2, 3, 4]
+    sink.close()
+
+
+def test_spending_by_category_typed_frame(tmp_path):
+    """Типизированная выгрузка из load_operations (даты платежа — datetime, строки — category) обрабатывается"""
+    filename = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["01.12.2021 12:00:00", "15.12.2021 10:30:00", "05.01.2022 08:00:00"],
+            "Дата платежа": ["01.12.2021", "15.12.2021", "05.01.2022"],
+            "Категория": ["Продукты", "Продукты", "Продукты"],
+            "Описание": ["Магнит", "Колхоз", "Магнит"],
+            "Сумма операции": [-100.0, -200.0, -150.0],
+        }
+    ).to_excel(filename, index=False)
+    operations = load_operations(str(filename), cache_dir=str(tmp_path / "cache"))
+    expected = [{"Сумма операции": -300.0}, {"Сумма операции": -150.0}]
+    assert spending_by_category(operations, "Продукты", "2022.01.31") == expected
+    assert spending_by_category(SpendingIndex(operations), "Продукты", "2022.01.31") == expected
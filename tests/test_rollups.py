@@ -0,0 +1,120 @@
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.reports import calculate_spending_by_category, spending_by_category, spending_by_category_rollups
+from src.rollups import RollupStore
+from src.services import _cashback_by_category, get_profitable_cashback_categories
+from src.transactions import Transactions
+from src.views import generate_main_page
+
+
+@pytest.fixture
+def operations():
+    return pd.DataFrame(
+        {
+            "Дата операции": [
+                "31.12.2021 16:44:00",
+                "30.12.2021 10:00:00",
+                "15.12.2021 08:30:00",
+                "01.11.2021 12:00:00",
+                "20.11.2021 12:00:00",
+                "02.10.2021 09:00:00",
+            ],
+            "Номер карты": ["*7197", "*7197", "*4556", None, "*4556", "*7197"],
+            "Сумма операции": [-160.89, -64.0, -1000.0, 500.0, -250.0, -40.0],
+            "Сумма платежа": [-160.89, -64.0, -1000.0, 500.0, -250.0, -40.0],
+            "Категория": ["Супермаркеты", "Супермаркеты", "Переводы", "Пополнения", "Супермаркеты", "Фастфуд"],
+        }
+    )
+
+
+def test_cashback_matches_raw_operations(operations):
+    """Кешбэк из агрегатов совпадает с расчетом по исходным операциям"""
+    rollups = RollupStore().append(operations)
+    for month in (10, 11, 12):
+        expected = _cashback_by_category(operations, 2021, month).sort_index()
+        assert rollups.cashback(2021, month).sort_index().round(2).to_dict() == expected.round(2).to_dict()
+    assert json.loads(get_profitable_cashback_categories(rollups, "2021", "12")) == {"Супермаркеты": 2.25}
+    assert json.loads(get_profitable_cashback_categories(rollups, "2021", "13")) == {}
+
+
+def test_cashback_rounding_matches_raw_operations():
+    """Кешбэк копится в целых копейках, поэтому половина копейки округляется так же, как по исходным операциям"""
+    operations = pd.DataFrame(
+        {
+            "Дата операции": [f"{day:02d}.02.2018 12:00:00" for day in range(1, 7)],
+            "Категория": ["Супермаркеты"] * 6,
+            "Сумма операции": [-1000.1, -999.9, -1000.3, -1000.2, -1000.4, -197.6],
+        }
+    )
+    rollups = RollupStore()
+    for start in range(len(operations)):
+        rollups.append(operations.iloc[start : start + 1])
+    expected = get_profitable_cashback_categories(operations.to_dict(orient="records"), "2018", "02")
+    assert get_profitable_cashback_categories(rollups, "2018", "02") == expected == '{"Супермаркеты": 51.99}'
+
+
+def test_incremental_append(operations):
+    """Агрегаты, накопленные по частям, совпадают с построенными за один раз"""
+    whole = RollupStore().append(operations)
+    parts = RollupStore()
+    parts.append(operations.iloc[:2]).append(Transactions.from_frame(operations.iloc[2:4]))
+    parts.append(operations.iloc[4:].to_dict(orient="records"))
+    assert parts.month(2021, 12).sort_index().equals(whole.month(2021, 12).sort_index())
+    assert parts.month(2021, 11, "card").to_dict() == whole.month(2021, 11, "card").to_dict()
+    assert parts.summary()["total_spent"] == pytest.approx(whole.summary()["total_spent"])
+
+
+def test_period_totals(operations):
+    """Итоги за интервал собираются из месяцев и дней на границах"""
+    rollups = RollupStore().append(operations)
+    start, end = date(2021, 10, 1), date(2021, 12, 30)
+    totals = rollups.total("card", "*7197", start, end)
+    assert totals["count"] == 2
+    assert totals["payments"] == pytest.approx(-104.0)
+    assert rollups.total("category", "Нет такой", start, end)["count"] == 0
+
+
+def test_spending_by_category_from_rollups(operations):
+    """Траты по категории за три месяца берутся из агрегатов по месяцам и совпадают с расчетом по операциям:
+    дата ГГГГ.ММ.ДД — это полночь, поэтому операции самого этого дня не учитываются"""
+    rollups = RollupStore().append(operations)
+    result = spending_by_category_rollups.__wrapped__(rollups, "Супермаркеты", "2021.12.31")
+    assert [record["Количество операций"] for record in result] == [1, 1]
+    assert [round(record["Сумма операции"], 2) for record in result] == [-250.0, -64.0]
+    for date in ("2021.12.31", "2022.01.01", "2021.12.30"):
+        expected = calculate_spending_by_category(operations, "Супермаркеты", date)
+        result = spending_by_category_rollups.__wrapped__(rollups, "Супермаркеты", date)
+        assert [record["Сумма операции"] for record in result] == pytest.approx(
+            [record["Сумма операции"] for record in expected]
+        )
+    assert spending_by_category_rollups.__wrapped__(rollups, "Нет такой", "2021.12.31") == []
+    assert spending_by_category.__wrapped__.__wrapped__(rollups, "Супермаркеты", "2021.12.31") == ""
+
+
+def test_version_changes_fingerprint(operations):
+    rollups = RollupStore().append(operations.iloc[:3])
+    fingerprint = rollups.fingerprint
+    rollups.append(operations.iloc[3:])
+    assert rollups.fingerprint != fingerprint
+
+
+def test_main_page_summary(operations):
+    """Главная страница берет сводку по транзакциям из агрегатов"""
+    rollups = RollupStore().append(operations)
+    result = generate_main_page(rollups, "RUB", 100, 1234567890123456, "31.12.2021 12:00:00")
+    analysis = result["transaction_analysis"]
+    assert analysis["total_spent"] == pytest.approx(operations["Сумма платежа"].sum())
+    assert analysis["top_5_transactions"]["Сумма платежа"].tolist()[0] == 500.0
+    assert rollups.summary("*4556")["total_spent"] == pytest.approx(-1250.0)
+
+
+def test_from_file(operations, tmp_path):
+    filename = str(tmp_path / "operations.csv")
+    operations.to_csv(filename, index=False)
+    rollups = RollupStore.from_file(filename, chunk_size=2)
+    assert rollups.version == 3
+    assert rollups.month(2021, 12)["count"].sum() == 3
@@ -2,7 +2,15 @@ import unittest
 from unittest.mock import patch
 import json
 
-from src.services import get_profitable_cashback_categories
+import pandas as pd
+
+from src.services import (
+    CashbackCube,
+    get_cashback_by_periods,
+    get_profitable_cashback_categories,
+    get_profitable_cashback_categories_stream,
+    _sorted_cashback,
+)
 
 
 class TestProfitableCashbackCategories(unittest.TestCase):
@@ -17,7 +25,7 @@ class TestProfitableCashbackCategories(unittest.TestCase):
             {"Дата операции": "10.03.2023 16:45:00", "Категория": "Техника", "Сумма операции": -300.0},
             {"Дата операции": "05.03.2023 18:00:00", "Категория": "Переводы", "Сумма операции": -100.0},
         ]
-        expected_result = {"Техника": 5.0, "Еда": 1.2}
+        expected_result = {"Техника": 8.0, "Еда": 3.7}
         expected_json_result = json.dumps(expected_result, ensure_ascii=False)
         result = get_profitable_cashback_categories(data, "2023", "03")
         self.assertEqual(result, expected_json_result)
@@ -51,3 +59,100 @@ class TestProfitableCashbackCategories(unittest.TestCase):
         ]
         result = get_profitable_cashback_categories(data, "2023", "03")
         self.assertEqual(result, "{}")
+
+    @patch("src.services.logger")
+    def test_get_profitable_cashback_categories_stream(self, mock_logger):
+        """Тестируем потоковый режим: частичные суммы по пачкам складываются"""
+        first = pd.DataFrame(
+            {
+                "Дата операции": ["15.03.2023 10:15:00", "25.03.2023 12:30:00"],
+                "Категория": ["Еда", "Техника"],
+                "Сумма операции": [-120.0, -500.0],
+            }
+        )
+        second = pd.DataFrame(
+            {
+                "Дата операции": ["20.03.2023 14:00:00", "05.03.2023 18:00:00", "05.04.2023 18:00:00"],
+                "Категория": ["Еда", "Переводы", "Еда"],
+                "Сумма операции": [-250.0, -100.0, -1000.0],
+            }
+        )
+        result = get_profitable_cashback_categories_stream(iter([first, second]), "2023", "03")
+        self.assertEqual(result, json.dumps({"Техника": 5.0, "Еда": 3.7}, ensure_ascii=False))
+
+    @patch("src.services.logger")
+    def test_get_profitable_cashback_categories_stream_invalid_month(self, mock_logger):
+        """Тестируем потоковый режим с некорректным месяцем"""
+        self.assertEqual(get_profitable_cashback_categories_stream(iter([]), "2023", "13"), "{}")
+
+
+class TestCashbackByPeriods(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [
+            {"Дата операции": "15.03.2023 10:15:00", "Категория": "Еда", "Сумма операции": -120.0},
+            {"Дата операции": "20.03.2023 14:00:00", "Категория": "Еда", "Сумма операции": -250.0},
+            {"Дата операции": "25.04.2023 12:30:00", "Категория": "Техника", "Сумма операции": -500.0},
+            {"Дата операции": "05.04.2023 18:00:00", "Категория": "Переводы", "Сумма операции": -100.0},
+            {"Дата операции": "06.04.2023 18:00:00", "Категория": "Еда", "Сумма операции": 100.0},
+        ]
+
+    @patch("src.services.logger")
+    def test_all_months(self, mock_logger):
+        """Все месяцы считаются за один проход"""
+        result = json.loads(get_cashback_by_periods(self.data))
+        self.assertEqual(result, {"2023-03": {"Еда": 3.7}, "2023-04": {"Техника": 5.0}})
+
+    @patch("src.services.logger")
+    def test_selected_periods_match_single_month(self, mock_logger):
+        """Ответ куба совпадает с расчетом за один месяц, пустые и неверные месяцы обрабатываются"""
+        cube = CashbackCube(self.data)
+        result = json.loads(get_cashback_by_periods(cube, [("2023", "03"), ("2023", "05"), ("2023", "13")]))
+        expected = {"2023-03": json.loads(get_profitable_cashback_categories(self.data, "2023", "03")), "2023-05": {}}
+        self.assertEqual(result, expected)
+        self.assertEqual(cube.months(), [("2023", "03"), ("2023", "04")])
+
+
+def test_cashback_ties_ordered_by_category():
+    """Категории с одинаковым округленным кешбэком упорядочены по названию при любом способе расчета"""
+    data = [
+        {"Дата операции": "15.03.2023 10:15:00", "Категория": "Косметика", "Сумма операции": -15.001},
+        {"Дата операции": "16.03.2023 10:15:00", "Категория": "Другое", "Сумма операции": -14.999},
+        {"Дата операции": "17.03.2023 10:15:00", "Категория": "Аптеки", "Сумма операции": -100.0},
+    ]
+    expected = '{"Аптеки": 1.0, "Другое": 0.15, "Косметика": 0.15}'
+    assert get_profitable_cashback_categories(data, "2023", "03") == expected
+    assert get_cashback_by_periods(data, [("2023", "03")]) == '{"2023-03": ' + expected + "}"
+
+
+def test_missing_category_same_on_every_path(tmp_path):
+    """Операции без категории учитываются как "Отсутствует" в списке, Transactions, агрегатах и кубе"""
+    from src.rollups import RollupStore
+    from src.store import load_operations
+    from src.utils import reading_xlsx
+
+    filename = str(tmp_path / "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["15.03.2023 10:15:00", "16.03.2023 11:00:00", "17.03.2023 12:00:00"],
+            "Категория": ["Еда", None, "Переводы"],
+            "Сумма операции": [-120.0, -300.0, -50.0],
+            "Сумма платежа": [-120.0, -300.0, -50.0],
+        }
+    ).to_excel(filename, index=False)
+    expected = '{"Отсутствует": 3.0, "Еда": 1.2}'
+
+    assert get_profitable_cashback_categories(reading_xlsx(filename), "2023", "03") == expected
+    assert get_profitable_cashback_categories(reading_xlsx(filename, compact=True), "2023", "03") == expected
+    assert get_profitable_cashback_categories(RollupStore.from_file(filename), "2023", "03") == expected
+    cube = CashbackCube(load_operations(filename, cache_dir=str(tmp_path / "cache")))
+    assert get_cashback_by_periods(cube, [("2023", "03")]) == '{"2023-03": ' + expected + "}"
+
+
+def test_half_kopeck_rounded_up_regardless_of_summation():
+    """Половина копейки округляется вверх и при точной сумме, и при сумме с погрешностью float"""
+    assert _sorted_cashback(pd.Series({"Еда": 51.985, "Кафе": 51.98500000000001, "Такси": 1.6049})) == {
+        "Еда": 51.99,
+        "Кафе": 51.99,
+        "Такси": 1.6,
+    }
@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.store import iter_operations, load_operations, operation_days, to_records
+
+
+@pytest.fixture
+def operations_file(tmp_path):
+    data = {
+        "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00", "15.11.2021 08:30:00"],
+        "Дата платежа": ["31.12.2021", None, "15.11.2021"],
+        "Номер карты": ["*7197", "*7197", None],
+        "Сумма операции": [-160.89, -64.0, 1000.0],
+        "Категория": ["Супермаркеты", "Транспорт", "Пополнения"],
+    }
+    filename = tmp_path / "operations.xlsx"
+    pd.DataFrame(data).to_excel(filename, index=False)
+    return str(filename)
+
+
+def test_load_operations_typed(operations_file, tmp_path):
+    """Проверяет, что даты и суммы приходят уже разобранными"""
+    frame = load_operations(operations_file, cache_dir=str(tmp_path / "cache"))
+    assert pd.api.types.is_datetime64_dtype(frame["Дата операции"])
+    assert frame["Сумма операции"].dtype == "float64"
+    assert frame["Категория"].tolist() == ["Супермаркеты", "Транспорт", "Пополнения"]
+
+
+def test_load_operations_uses_cache(operations_file, tmp_path, monkeypatch):
+    """Повторная загрузка не должна разбирать EXCEL-файл"""
+    cache_dir = str(tmp_path / "cache")
+    first = load_operations(operations_file, cache_dir=cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("EXCEL-файл разобран повторно")
+
+    monkeypatch.setattr(pd, "read_excel", fail)
+    second = load_operations(operations_file, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_load_operations_rebuilds_on_change(operations_file, tmp_path):
+    """Кэш пересобирается, если исходный файл изменился"""
+    cache_dir = str(tmp_path / "cache")
+    load_operations(operations_file, cache_dir=cache_dir)
+    pd.DataFrame({"Дата операции": ["01.01.2022 00:00:00"], "Сумма операции": [-1.0]}).to_excel(
+        operations_file, index=False
+    )
+    stat = os.stat(operations_file)
+    os.utime(operations_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    frame = load_operations(operations_file, cache_dir=cache_dir)
+    assert len(frame) == 1
+
+
+def test_to_records_matches_source_format(operations_file, tmp_path):
+    """Записи из кэша совпадают с прямым чтением EXCEL-файла"""
+    frame = load_operations(operations_file, cache_dir=str(tmp_path / "cache"))
+    expected = pd.read_excel(operations_file)
+    expected = expected.where(pd.notnull(expected), expected.fillna("Отсутствует")).to_dict(orient="records")
+    assert to_records(frame) == expected
+
+
+def test_iter_operations_batches(operations_file):
+    """Потоковое чтение отдает типизированные пачки заданного размера"""
+    batches = list(iter_operations(operations_file, chunk_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert pd.api.types.is_datetime64_dtype(batches[0]["Дата операции"])
+    assert batches[1]["Категория"].tolist() == ["Пополнения"]
+
+
+def test_iter_operations_csv(tmp_path):
+    """CSV-выгрузка читается теми же пачками"""
+    filename = tmp_path / "operations.csv"
+    pd.DataFrame({"Дата операции": ["01.01.2022 10:00:00"] * 5, "Сумма операции": [-1.0] * 5}).to_csv(
+        filename, index=False
+    )
+    assert [len(batch) for batch in iter_operations(str(filename), chunk_size=3)] == [3, 2]
+
+
+def test_iter_operations_invalid_chunk(operations_file):
+    with pytest.raises(ValueError):
+        list(iter_operations(operations_file, chunk_size=0))
+
+
+def test_operation_days():
+    """Даты разбираются по позициям символов, некорректные строки отвергаются как при strptime"""
+    dates = pd.Series(["15.03.2023 10:15:00", "29.02.2024 23:59:59"])
+    assert operation_days(dates).tolist() == [20230315, 20240229]
+    assert operation_days(pd.to_datetime(dates, format="%d.%m.%Y %H:%M:%S")).tolist() == [20230315, 20240229]
+    invalid_dates = (
+        "15.03.2023 garbage!!",
+        "15.03.2023 garbage!",
+        "15.03.2023 25:00:00",
+        "29.02.2023 10:00:00",
+        "15/03/2023 10:15:00",
+    )
+    for invalid in invalid_dates:
+        with pytest.raises(ValueError):
+            operation_days(pd.Series(["15.03.2023 10:15:00", invalid]))
@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reports import spending_by_category
+from src.services import get_profitable_cashback_categories
+from src.store import to_records
+from src.transactions import MISSING_TIMESTAMP, Transactions
+from src.utils import reading_xlsx
+
+
+@pytest.fixture
+def records():
+    return [
+        {
+            "Дата операции": "15.03.2023 10:15:00",
+            "Дата платежа": "16.03.2023",
+            "Категория": "Еда",
+            "Сумма операции": -120.0,
+            "Бонусы (включая кэшбэк)": 2,
+        },
+        {
+            "Дата операции": "25.03.2023 12:30:00",
+            "Дата платежа": "Отсутствует",
+            "Категория": "Техника",
+            "Сумма операции": -500.0,
+            "Бонусы (включая кэшбэк)": 10,
+        },
+        {
+            "Дата операции": "05.02.2023 18:00:00",
+            "Дата платежа": "06.02.2023",
+            "Категория": "Отсутствует",
+            "Сумма операции": -100.0,
+            "Бонусы (включая кэшбэк)": 0,
+        },
+    ]
+
+
+def test_from_records_typed_columns(records):
+    """Даты хранятся секундами от эпохи, суммы — float64, строки — кодами словаря"""
+    transactions = Transactions.from_records(records)
+    assert len(transactions) == 3
+    assert transactions.values("Дата операции").dtype == np.int64
+    assert transactions.values("Дата платежа")[1] == MISSING_TIMESTAMP
+    assert transactions.values("Сумма операции").dtype == np.float64
+    codes, categories = transactions.codes("Категория")
+    assert categories == ["Еда", "Техника"]
+    assert codes.tolist() == [0, 1, -1]
+    assert transactions.periods().tolist() == [202303, 202303, 202302]
+    assert transactions.numeric_columns == ["Сумма операции", "Бонусы (включая кэшбэк)"]
+
+
+def test_round_trip_to_records(records):
+    """Из компактного представления восстанавливается исходный список словарей"""
+    transactions = Transactions.from_records(records)
+    assert to_records(transactions.to_frame()) == records
+
+
+def test_masks_and_take(records):
+    """Отбор по категории и периоду работает по кодам и секундам"""
+    transactions = Transactions.from_records(records)
+    mask = transactions.equals("Категория", "Техника")
+    mask &= transactions.between("Дата операции", pd.Timestamp("2023-03-01"), pd.Timestamp("2023-03-31"))
+    selected = transactions.take(mask)
+    assert len(selected) == 1
+    assert selected["Сумма операции"].tolist() == [-500.0]
+    assert not transactions.equals("Категория", "Нет такой").any()
+
+
+def test_fingerprint(records):
+    """Отпечаток зависит только от содержимого"""
+    assert Transactions.from_records(records).fingerprint == Transactions.from_records(records).fingerprint
+    changed = [dict(records[0], **{"Сумма операции": -1.0})] + records[1:]
+    assert Transactions.from_records(records).fingerprint != Transactions.from_records(changed).fingerprint
+
+
+def test_cashback_accepts_transactions(records):
+    """Расчет кешбэка принимает Transactions и совпадает с расчетом по DataFrame"""
+    transactions = Transactions.from_records(records)
+    result = get_profitable_cashback_categories(transactions, "2023", "03")
+    assert json.loads(result) == {"Техника": 5.0, "Еда": 1.2}
+
+
+def test_spending_accepts_transactions(records):
+    """Траты по категории считаются по числовым столбцам компактного представления"""
+    transactions = Transactions.from_records(records)
+    result = spending_by_category.__wrapped__.__wrapped__(transactions, "Техника", "2023.03.31")
+    assert result == [{"Сумма операции": -500.0, "Бонусы (включая кэшбэк)": 10}]
+
+
+def test_reading_xlsx_compact(tmp_path):
+    """reading_xlsx(compact=True) возвращает Transactions, занимающий много меньше списка словарей"""
+    filename = str(tmp_path / "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00"] * 50,
+            "Категория": ["Супермаркеты"] * 50,
+            "Описание": ["Колхоз"] * 50,
+            "Сумма операции": np.arange(50, dtype=float),
+        }
+    ).to_excel(filename, index=False)
+    transactions = reading_xlsx(filename, compact=True)
+    assert isinstance(transactions, Transactions)
+    assert transactions.periods().tolist() == [202112] * 50
+    assert transactions.nbytes < 60 * len(transactions)
+
+
+def test_missing_category_matches_list(records):
+    """Пропущенная категория отбирается по значению "Отсутствует", как в списке операций"""
+    transactions = Transactions.from_records(records)
+    assert transactions.equals("Категория", "Отсутствует").tolist() == [False, False, True]
+    result = spending_by_category.__wrapped__.__wrapped__(transactions, "Отсутствует", "2023.03.31")
+    assert result == [{"Сумма операции": -100.0, "Бонусы (включая кэшбэк)": 0}]
@@ -8,6 +8,7 @@ from src.utils import (
     get_mask_account,
     get_convert_amount,
     analyze_transactions,
+    analyze_transactions_stream,
     stock_prices,
     hello_person,
 )
@@ -107,6 +108,24 @@ def test_analyze_transactions_empty():
     assert result["top_5_transactions"].empty, "Топ-5 должен быть пустым для пустого DataFrame"
 
 
+def test_analyze_transactions_stream():
+    """Тестирует потоковый расчет: результат совпадает с расчетом по всему DataFrame"""
+    df = pd.DataFrame({"Сумма платежа": [500, 1500, 3000, 1200, 7000, 2500, 100]})
+
+    result = analyze_transactions_stream(iter([df.iloc[:3], df.iloc[3:5], df.iloc[5:]]))
+
+    assert result["total_spent"] == 15800
+    assert result["cashback"] == 158
+    assert result["top_5_transactions"]["Сумма платежа"].tolist() == [7000, 3000, 2500, 1500, 1200]
+
+
+def test_analyze_transactions_stream_empty():
+    """Тестирует потоковый расчет без данных"""
+    result = analyze_transactions_stream(iter([]))
+    assert result["total_spent"] == 0
+    assert result["top_5_transactions"].empty
+
+
 @pytest.mark.parametrize(
     "time_str, expected_greeting",
     [
@@ -145,3 +164,20 @@ def test_hello_person_invalid_format():
 )
 def test_stock_prices(input_stock, exit_stock):
     assert stock_prices(input_stock) == exit_stock
+
+
+def test_stock_prices_does_not_mutate_info():
+    """stock_prices возвращает новый словарь и работает без аргументов"""
+    info = {"greeting": "Добрый день"}
+    result = stock_prices(info)
+    assert info == {"greeting": "Добрый день"}
+    assert result["greeting"] == "Добрый день"
+    assert stock_prices()["stock_prices"] == result["stock_prices"]
+
+
+def test_quote_provider_refreshes_in_background():
+    """Общий кэш котировок обновляется в фоне с момента создания"""
+    from src.utils import get_quote_provider
+
+    provider = get_quote_provider()
+    assert provider._refresher is not None and provider._refresher.is_alive()
@@ -0,0 +1,101 @@
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.analytics import TransactionAnalyzer
+from src.utils import get_quote_provider
+from src.views import generate_main_page, generate_main_page_concurrent
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({"Сумма платежа": [500, 1500, 3000]})
+
+
+@patch("src.views.get_convert_amount", return_value=9050.0)
+def test_generate_main_page(mock_convert, transactions):
+    """Все разделы главной страницы заполнены (котировки берутся из уже заполненного кэша)"""
+    get_quote_provider().get_quotes(wait=None)
+    result = generate_main_page(transactions, "USD", 100, 1234567890123456, "30.01.2024 08:00:00")
+    assert result["greeting"] == "Доброе утро"
+    assert result["masked_account"] == "1234 ** 3456"
+    assert result["converted_amount"] == 9050.0
+    assert result["transaction_analysis"]["total_spent"] == 5000
+    assert len(result["stock_pricess"]["stock_prices"]) == 3
+
+
+def test_generate_main_page_concurrent_runs_sections_in_parallel(transactions):
+    """Время формирования страницы определяется самым медленным разделом, а не суммой"""
+
+    def slow(*args, **kwargs):
+        time.sleep(0.3)
+        return 1.0
+
+    with patch("src.views.get_convert_amount", side_effect=slow), patch("src.views.stock_prices", side_effect=slow):
+        started = time.perf_counter()
+        result = generate_main_page_concurrent(transactions, "USD", 100, 1234567890123456, "30.01.2024 08:00:00")
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.55
+    assert result["converted_amount"] == 1.0
+    assert result["errors"] == {}
+    assert set(result["timings"]) == {
+        "greeting",
+        "masked_account",
+        "converted_amount",
+        "transaction_analysis",
+        "stock_pricess",
+    }
+
+
+def test_generate_main_page_concurrent_partial_result_on_timeout(transactions):
+    """Раздел, не успевший к сроку, пропускается, остальные возвращаются"""
+
+    def slow(*args, **kwargs):
+        time.sleep(0.5)
+        return 1.0
+
+    with patch("src.views.get_convert_amount", side_effect=slow):
+        result = generate_main_page_concurrent(
+            transactions, "USD", 100, 1234567890123456, "30.01.2024 08:00:00", deadline=0.1
+        )
+
+    assert result["converted_amount"] is None
+    assert "converted_amount" in result["errors"]
+    assert result["greeting"] == "Доброе утро"
+
+
+def test_generate_main_page_concurrent_section_error(transactions):
+    """Ошибка в разделе не мешает формированию остальных"""
+    result = generate_main_page_concurrent(transactions, "USD", 100, 1234567890123456, "bad time")
+    assert result["greeting"] is None
+    assert result["errors"]["greeting"] == "Некорректный формат времени"
+    assert result["masked_account"] == "1234 ** 3456"
+
+
+@patch("src.views.get_convert_amount", return_value=0)
+def test_generate_main_page_with_analyzer(mock_convert, transactions):
+    """Главная страница берет анализ из накопительного анализатора"""
+    analyzer = TransactionAnalyzer().update(transactions)
+    result = generate_main_page(analyzer, "USD", 100, 1234567890123456, "30.01.2024 08:00:00")
+    assert result["transaction_analysis"]["total_spent"] == 5000
+
+
+def test_main_page_does_not_wait_for_quotes(transactions):
+    """Главная страница не ждет котировки, которых еще нет в кэше"""
+    from src.quotes import QuoteProvider, StaticQuoteBackend
+
+    class SlowBackend(StaticQuoteBackend):
+        def fetch(self, symbols):
+            time.sleep(0.5)
+            return super().fetch(symbols)
+
+    provider = QuoteProvider(SlowBackend())
+    with patch("src.utils.quote_provider", provider), patch("src.views.get_convert_amount", return_value=1.0):
+        started = time.perf_counter()
+        result = generate_main_page(transactions, "USD", 100, 1234567890123456, "30.01.2024 08:00:00")
+        elapsed = time.perf_counter() - started
+    assert elapsed < 0.3
+    assert result["stock_pricess"]["stock_prices"] == []